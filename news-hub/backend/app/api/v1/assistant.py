@@ -1,12 +1,12 @@
 """AI Assistant API routes with streaming chat and RAG support."""
 
 import asyncio
-import json
 import re
 from contextlib import suppress
 from datetime import datetime
-from typing import AsyncGenerator, List, Optional
+from typing import AsyncGenerator, Awaitable, List, Optional, TypeVar
 
+import orjson
 from fastapi import APIRouter, Depends, HTTPException, Query, status
 from fastapi.responses import StreamingResponse
 from loguru import logger
@@ -57,6 +57,25 @@ _RESEARCH_FALLBACK_REPORT = (
     "研究流程已完成，但未收到最终报告正文。\n\n"
     "请重试一次；若持续出现，请检查 deep_research_agent 的合成阶段日志。"
 )
+_T = TypeVar("_T")
+
+# asyncio.timeout (3.11+) runs the awaitable in the current task; wait_for
+# wraps it in an extra Task. Python 3.10 keeps the wait_for path.
+_asyncio_timeout = getattr(asyncio, "timeout", None)
+_SSE_DONE = b'data: {"type":"done"}\n\n'
+
+
+def _sse(payload: dict) -> bytes:
+    """Frame one SSE message; orjson yields UTF-8 bytes with no str round-trip."""
+    return b"data: " + orjson.dumps(payload) + b"\n\n"
+
+
+async def _await_with_timeout(aw: Awaitable[_T], seconds: float) -> _T:
+    """Await ``aw``, raising ``asyncio.TimeoutError`` after ``seconds``."""
+    if _asyncio_timeout is None:
+        return await asyncio.wait_for(aw, timeout=seconds)
+    async with _asyncio_timeout(seconds):
+        return await aw
 
 
 def _service_error_to_http(error: ValueError) -> HTTPException:
@@ -117,7 +136,7 @@ async def chat_with_assistant(
         )
         return success_response(data=ChatResponseData(reply=reply))
 
-    async def event_generator() -> AsyncGenerator[str, None]:
+    async def event_generator() -> AsyncGenerator[bytes, None]:
         thread_id = request.thread_id or ""
         delta_count = 0
         delta_chars = 0
@@ -135,29 +154,25 @@ async def chat_with_assistant(
                 if delta.startswith("__thread_id__:"):
                     tid = delta.split(":", 1)[1]
                     thread_id = tid
-                    payload = json.dumps({"type": "thread_id", "thread_id": tid})
-                    yield f"data: {payload}\n\n"
+                    yield _sse({"type": "thread_id", "thread_id": tid})
                     continue
-                payload = json.dumps({"type": "delta", "content": delta})
                 delta_count += 1
                 delta_chars += len(delta)
-                yield f"data: {payload}\n\n"
+                yield _sse({"type": "delta", "content": delta})
             done_sent = True
-            yield 'data: {"type": "done"}\n\n'
+            yield _SSE_DONE
         except asyncio.CancelledError:
             stream_cancelled = True
             error_msg = "stream_cancelled"
             raise
         except Exception as e:
             error_msg = str(e)
-            error_payload = json.dumps({"type": "error", "content": str(e)})
-            yield f"data: {error_payload}\n\n"
+            yield _sse({"type": "error", "content": str(e)})
         except BaseException as e:  # pragma: no cover - defensive guard
             error_msg = f"{type(e).__name__}: {e}"
             if isinstance(e, (GeneratorExit, KeyboardInterrupt, SystemExit)):
                 raise
-            error_payload = json.dumps({"type": "error", "content": error_msg})
-            yield f"data: {error_payload}\n\n"
+            yield _sse({"type": "error", "content": error_msg})
         finally:
             with suppress(Exception):
                 await stream.aclose()
@@ -211,17 +226,15 @@ async def chat_with_rag(
             chunks.append(chunk)
         return success_response(data=ChatResponseData(reply="".join(chunks)))
 
-    async def event_generator() -> AsyncGenerator[str, None]:
+    async def event_generator() -> AsyncGenerator[bytes, None]:
         try:
             async for delta in service.chat_with_rag(
                 messages=messages, user_id=current_user.id
             ):
-                payload = json.dumps({"type": "delta", "content": delta})
-                yield f"data: {payload}\n\n"
-            yield 'data: {"type": "done"}\n\n'
+                yield _sse({"type": "delta", "content": delta})
+            yield _SSE_DONE
         except Exception as e:
-            error_payload = json.dumps({"type": "error", "content": str(e)})
-            yield f"data: {error_payload}\n\n"
+            yield _sse({"type": "error", "content": str(e)})
 
     return StreamingResponse(
         event_generator(),
@@ -473,12 +486,12 @@ async def ingest_one_stream(
     from app.services.ai.virtual_source import VirtualSourceManager
     from app.services.collector.webpage_extractor import WebpageExtractor
 
-    async def event_stream() -> AsyncGenerator[str, None]:
+    async def event_stream() -> AsyncGenerator[bytes, None]:
         def emit(step: str, status: str, message: str, detail: dict = None, elapsed_ms: int = 0):
             payload = {"step": step, "status": status, "message": message, "elapsed_ms": elapsed_ms}
             if detail:
                 payload["detail"] = detail
-            return f"data: {json.dumps(payload, ensure_ascii=False)}\n\n"
+            return _sse(payload)
 
         t_total = _time.monotonic()
         extracted = {}
@@ -489,11 +502,7 @@ async def ingest_one_stream(
         yield emit("crawler_init", "running", "检查 Crawl4AI 服务...")
         t0 = _time.monotonic()
         try:
-            import httpx as _httpx
-            from app.core.config import settings as _settings
-            async with _httpx.AsyncClient(timeout=5) as _client:
-                _health = await _client.get(f"{_settings.crawl4ai_base_url.rstrip('/')}/health")
-                _health.raise_for_status()
+            await extractor.check_health()
             ms = int((_time.monotonic() - t0) * 1000)
             yield emit("crawler_init", "done", "Crawl4AI 服务就绪", elapsed_ms=ms)
         except Exception as e:
@@ -507,8 +516,8 @@ async def ingest_one_stream(
         content = ""
         md_source = ""
         try:
-            extracted = await asyncio.wait_for(
-                extractor._crawl_via_api(request.url), timeout=150.0
+            extracted = await _await_with_timeout(
+                extractor._crawl_via_api(request.url), 150.0
             )
             ms = int((_time.monotonic() - t0) * 1000)
             if extracted and extracted.get("content"):
@@ -532,8 +541,8 @@ async def ingest_one_stream(
             yield emit("fallback_fetch", "running", "httpx 备用抓取...")
             t0 = _time.monotonic()
             try:
-                fallback_result = await asyncio.wait_for(
-                    extractor._fallback_extract(request.url), timeout=15.0
+                fallback_result = await _await_with_timeout(
+                    extractor._fallback_extract(request.url), 15.0
                 )
                 ms = int((_time.monotonic() - t0) * 1000)
                 if fallback_result and fallback_result.get("content"):
@@ -697,8 +706,8 @@ async def ingest_one(
     extracted = {}
     crawl_method = "crawl4ai"
     try:
-        extracted = await asyncio.wait_for(
-            extractor.extract(request.url), timeout=15.0
+        extracted = await _await_with_timeout(
+            extractor.extract(request.url), 15.0
         )
     except asyncio.TimeoutError:
         logger.warning(f"Crawl timeout for {request.url}, falling back to snippet")
@@ -800,8 +809,8 @@ async def ingest_batch(
     # Batch crawl with timeout
     batch_results = []
     try:
-        batch_results = await asyncio.wait_for(
-            extractor.batch_extract(urls), timeout=60.0
+        batch_results = await _await_with_timeout(
+            extractor.batch_extract(urls), 60.0
         )
     except asyncio.TimeoutError:
         logger.warning("Batch crawl timeout, returning partial results")
@@ -1044,19 +1053,15 @@ async def debug_crawl(
 
     # Stage 1: Health check
     try:
-        import httpx
-        from app.core.config import settings as _settings
-        async with httpx.AsyncClient(timeout=5) as client:
-            health = await client.get(f"{_settings.crawl4ai_base_url.rstrip('/')}/health")
-            diag["stages"]["health"] = health.json()
+        diag["stages"]["health"] = await extractor.check_health()
     except Exception as e:
         diag["stages"]["health"] = f"FAIL: {e}"
         return success_response(data=diag)
 
     # Stage 2: Full extraction
     try:
-        extracted = await asyncio.wait_for(
-            extractor.extract(url), timeout=30.0
+        extracted = await _await_with_timeout(
+            extractor.extract(url), 30.0
         )
         diag["stages"]["extract"] = {
             "title": extracted.get("title", ""),
@@ -1096,15 +1101,13 @@ async def research_with_agent(
             chunks.append(chunk)
         return success_response(data=ChatResponseData(reply="".join(chunks)))
 
-    async def event_generator() -> AsyncGenerator[str, None]:
+    async def event_generator() -> AsyncGenerator[bytes, None]:
         try:
             async for delta in agent.chat(messages=messages, user_id=current_user.id):
-                payload = json.dumps({"type": "delta", "content": delta})
-                yield f"data: {payload}\n\n"
-            yield 'data: {"type": "done"}\n\n'
+                yield _sse({"type": "delta", "content": delta})
+            yield _SSE_DONE
         except Exception as e:
-            error_payload = json.dumps({"type": "error", "content": str(e)})
-            yield f"data: {error_payload}\n\n"
+            yield _sse({"type": "error", "content": str(e)})
 
     return StreamingResponse(
         event_generator(),
@@ -1174,7 +1177,7 @@ async def deep_research(
             data=DeepResearchResponseData(query=request.query, report=full_report)
         )
 
-    async def event_generator() -> AsyncGenerator[str, None]:
+    async def event_generator() -> AsyncGenerator[bytes, None]:
         has_status = False
         has_report = False
         report_content_chars = 0
@@ -1198,26 +1201,23 @@ async def deep_research(
                 elif has_report:
                     # Count chars of actual report content (after marker)
                     report_content_chars += len(delta)
-                payload = json.dumps({"type": "delta", "content": delta})
-                yield f"data: {payload}\n\n"
+                yield _sse({"type": "delta", "content": delta})
             # Inject fallback if no report marker OR marker present but no content after it
             if has_status and (not has_report or report_content_chars < 10):
                 fallback_injected = True
                 fallback_content = f"\n[REPORT_START]\n{_RESEARCH_FALLBACK_REPORT}"
                 delta_count += 1
                 delta_chars += len(fallback_content)
-                fallback_payload = json.dumps(
+                yield _sse(
                     {
                         "type": "delta",
                         "content": fallback_content,
                     }
                 )
-                yield f"data: {fallback_payload}\n\n"
-            yield 'data: {"type": "done"}\n\n'
+            yield _SSE_DONE
         except Exception as e:
             stream_error = str(e)
-            error_payload = json.dumps({"type": "error", "content": str(e)})
-            yield f"data: {error_payload}\n\n"
+            yield _sse({"type": "error", "content": str(e)})
         finally:
             logger.info(
                 "deep_research_summary stream=True user_id={} query={} deltas={} chars={} has_status={} has_report={} report_content_chars={} fallback_injected={} error={}",
@@ -1271,19 +1271,17 @@ async def debate_research(
             data=DeepResearchResponseData(query=request.query, report=full_report)
         )
 
-    async def event_generator() -> AsyncGenerator[str, None]:
+    async def event_generator() -> AsyncGenerator[bytes, None]:
         try:
             async for delta in engine.run(
                 query=request.query,
                 user_id=current_user.id,
                 system_prompt=request.system_prompt,
             ):
-                payload = json.dumps({"type": "delta", "content": delta})
-                yield f"data: {payload}\n\n"
-            yield 'data: {"type": "done"}\n\n'
+                yield _sse({"type": "delta", "content": delta})
+            yield _SSE_DONE
         except Exception as e:
-            ep = json.dumps({"type": "error", "content": str(e)})
-            yield f"data: {ep}\n\n"
+            yield _sse({"type": "error", "content": str(e)})
 
     return StreamingResponse(
         event_generator(),
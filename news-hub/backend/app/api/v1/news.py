@@ -21,6 +21,7 @@ from app.schemas.news import (
     NewsMetadata,
 )
 from app.schemas.user import UserInDB
+from app.services.tagging import TagService
 
 router = APIRouter(prefix="/news", tags=["News"])
 
@@ -271,11 +272,18 @@ async def delete_news_item(
             status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid news ID format"
         )
 
-    result = await db.news.delete_one({"_id": oid, "user_id": current_user.id})
+    deleted = await db.news.find_one_and_delete(
+        {"_id": oid, "user_id": current_user.id}, projection={"tags": 1}
+    )
 
-    if result.deleted_count == 0:
+    if deleted is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="News item not found"
         )
 
+    if deleted.get("tags"):
+        await TagService(db).bump_tag_counts(
+            current_user.id, removed=deleted["tags"]
+        )
+
     return success_response(data=None, message="News item deleted")
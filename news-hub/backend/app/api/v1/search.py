@@ -46,6 +46,7 @@ class SearchResponseData(BaseModel):
     results: List[SearchResultItem]
     took_ms: int
     search_type: str
+    next_cursor: Optional[str] = None
 
 
 class SuggestResponseData(BaseModel):
@@ -78,6 +79,13 @@ async def search_news(
     end_date: Optional[datetime] = Query(None, description="Filter to date"),
     page: int = Query(1, ge=1, description="Page number"),
     page_size: int = Query(20, ge=1, le=100, description="Results per page"),
+    cursor: Optional[str] = Query(
+        None,
+        description=(
+            "Keyword search cursor paging: empty on the first page, then the "
+            "previous page's next_cursor"
+        ),
+    ),
     current_user: UserInDB = Depends(get_current_user),
 ):
     """
@@ -88,7 +96,9 @@ async def search_news(
     - **semantic**: Vector similarity search using embeddings
     - **hybrid**: Combined keyword + semantic search (recommended)
 
-    Returns results with relevance scores and highlighted matches.
+    Returns results with relevance scores and highlighted matches. Keyword
+    searches sent with an empty `cursor` return a `next_cursor`; pass it
+    with the next page.
     """
     # Validate search type
     if search_type not in ["keyword", "semantic", "hybrid"]:
@@ -124,6 +134,7 @@ async def search_news(
         end_date=end_date,
         page=page,
         page_size=page_size,
+        cursor=cursor,
     )
 
     # Convert to API response
@@ -154,6 +165,7 @@ async def search_news(
             results=results,
             took_ms=response.took_ms,
             search_type=response.search_type,
+            next_cursor=response.next_cursor,
         )
     )
 
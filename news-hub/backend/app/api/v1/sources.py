@@ -16,6 +16,7 @@ from app.db.mongo import get_db
 from app.schemas.response import ResponseBase, success_response
 from app.schemas.source import (
     SourceCreate,
+    SourceDetectBatchRequest,
     SourceDetectRequest,
     SourceDetectResponse,
     SourceResponse,
@@ -23,7 +24,9 @@ from app.schemas.source import (
     SourceUpdate,
 )
 from app.schemas.user import UserInDB
+from app.services.pipeline import CollectionService
 from app.services.source.detector import SourceDetector
+from app.services.tagging import TagService
 
 router = APIRouter(prefix="/sources", tags=["Sources"])
 
@@ -133,6 +136,7 @@ async def create_source(
 
     result = await db.sources.insert_one(source_doc)
     source_doc["_id"] = result.inserted_id
+    CollectionService.invalidate_schedule()
 
     return success_response(
         data=source_doc_to_response(source_doc), message="Source created successfully"
@@ -209,6 +213,7 @@ async def update_source(
     update_fields["updated_at"] = datetime.utcnow()
 
     await db.sources.update_one({"_id": oid}, {"$set": update_fields})
+    CollectionService.invalidate_schedule()
 
     updated_source = await db.sources.find_one({"_id": oid})
     if not updated_source:
@@ -245,6 +250,7 @@ async def delete_source(
 
     # Also delete all news items from this source
     await db.news.delete_many({"source_id": source_id, "user_id": current_user.id})
+    await TagService(db).invalidate_tag_counts(current_user.id)
 
     return success_response(data=None, message="Source deleted")
 
@@ -266,6 +272,24 @@ async def detect_source(
     return success_response(data=result)
 
 
+@router.post(
+    "/detect/batch", response_model=ResponseBase[List[SourceDetectResponse]]
+)
+async def detect_sources(
+    request: SourceDetectBatchRequest,
+    current_user: UserInDB = Depends(get_current_user),
+):
+    """
+    Auto-detect several URLs at once, e.g. for a bulk import.
+
+    URLs are analyzed concurrently; results are returned in request order.
+    """
+    detector = SourceDetector()
+    results = await detector.detect_many([str(url) for url in request.urls])
+
+    return success_response(data=results)
+
+
 @router.post("/{source_id}/refresh", response_model=ResponseBase[dict])
 async def trigger_refresh(
     source_id: str,
@@ -273,8 +297,6 @@ async def trigger_refresh(
     db: AsyncIOMotorDatabase = Depends(get_db),
 ):
     """Manually trigger a refresh for a source and collect news."""
-    from app.services.pipeline import CollectionService
-
     try:
         oid = ObjectId(source_id)
     except Exception:
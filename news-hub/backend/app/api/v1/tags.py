@@ -220,13 +220,11 @@ async def retag_news_items(
 
     Useful after creating new tag rules to apply them to existing items.
     """
-    from app.services.tagging import RuleMatcher, TagService
-
-    # Get user's active rules
+    # Get the compiled matcher for the user's active rules
     service = TagService(db)
-    rules = await service.list_rules(user_id=current_user.id, is_active=True)
+    matcher = await service.get_matcher(current_user.id)
 
-    if not rules:
+    if matcher is None:
         return success_response(
             data={"retagged": 0}, message="No active tag rules found"
         )
@@ -247,21 +245,26 @@ async def retag_news_items(
     cursor = db.news.find(query).limit(limit)
     news_items = await cursor.to_list(length=limit)
 
-    # Create matcher
-    matcher = RuleMatcher(rules)
-
     # Retag items
     retagged = 0
-    rule_matches = {}
+    rule_matches: List[str] = []
 
-    for item in news_items:
-        matched_tags, matched_rule_ids = matcher.match(
-            title=item.get("title", ""),
-            description=item.get("description", ""),
-            content=item.get("content", ""),
-        )
+    matches = matcher.match_many(
+        [
+            (item.get("title", ""), item.get("description", ""), item.get("content", ""))
+            for item in news_items
+        ]
+    )
+
+    added_tags: List[str] = []
+    removed_tags: List[str] = []
 
+    for item, (matched_tags, matched_rule_ids) in zip(news_items, matches):
         if matched_tags:
+            old_tags = set(item.get("tags") or ())
+            added_tags.extend(t for t in matched_tags if t not in old_tags)
+            removed_tags.extend(old_tags.difference(matched_tags))
+
             # Update tags
             await db.news.update_one(
                 {"_id": item["_id"]},
@@ -270,18 +273,14 @@ async def retag_news_items(
             retagged += 1
 
             # Track rule matches for stats update
-            for rid in matched_rule_ids:
-                rule_matches[rid] = rule_matches.get(rid, 0) + 1
+            rule_matches.extend(matched_rule_ids)
 
-    # Update rule match counts
-    for rid, count in rule_matches.items():
-        try:
-            await db.tag_rules.update_one(
-                {"_id": ObjectId(rid)},
-                {"$inc": {"match_count": count}},
-            )
-        except Exception:
-            pass
+    # Update rule match counts in one bulk write
+    await service.increment_match_count(rule_matches)
+    await service.flush_match_counts()
+    await service.bump_tag_counts(
+        current_user.id, added=added_tags, removed=removed_tags
+    )
 
     return success_response(
         data={"retagged": retagged, "total_processed": len(news_items)},
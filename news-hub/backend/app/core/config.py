@@ -61,16 +61,60 @@ class Settings(BaseSettings):
     # === MongoDB ===
     mongodb_url: str = "mongodb://localhost:27017"
     mongodb_db_name: str = "news_hub"
+    # Connection pool: sockets kept open between bursts, the cap, and how
+    # long an operation waits for a free socket before failing
+    mongodb_min_pool_size: int = 10
+    mongodb_max_pool_size: int = 100
+    mongodb_wait_queue_timeout_ms: int = 5000
 
     # === Elasticsearch ===
     elasticsearch_url: str = "http://localhost:9200"
     elasticsearch_index_prefix: str = "news_hub"
     elasticsearch_username: Optional[str] = None
     elasticsearch_password: Optional[str] = None
+    # Bulk indexing: actions and bytes per _bulk request
+    es_bulk_chunk_size: int = 1000
+    es_bulk_max_bytes: int = 10 * 1024 * 1024
+    # Concurrent _bulk requests per batch (ES connections per node follow it)
+    es_bulk_concurrency: int = 4
+    # Batches at least this large are written with index refresh disabled
+    es_bulk_load_threshold: int = 1000
+    # Request timeout (seconds) for _bulk calls; the client default is 30s
+    es_bulk_timeout: int = 60
+    # Single-document indexing is coalesced into bulks of up to this many
+    # docs, waiting at most this long for a batch to fill
+    es_buffer_batch_size: int = 100
+    es_buffer_window_ms: int = 20
+    # Bounded queue in front of the buffer (producers block when full) and
+    # the number of worker tasks draining it
+    es_buffer_queue_size: int = 500
+    es_buffer_workers: int = 2
+    # Keyword searches that opt into cursor paging are served through a
+    # point-in-time + search_after cursor instead of a growing from offset
+    search_pit_keep_alive: str = "1m"
+    # Autocomplete results cached per (user, prefix, size) for this long
+    suggest_cache_size: int = 10000
+    suggest_cache_ttl: int = 30
 
     # === Vector Model ===
     embedding_model_name: str = "shibing624/text2vec-base-chinese"
     embedding_dimension: int = 768
+    # dense_vector index_options type for new indices: "int8_hnsw" (scalar
+    # quantized), "hnsw" (float32) or "bbq_hnsw" (1-bit, ES 8.16+)
+    embedding_index_type: str = "int8_hnsw"
+    # "torch" (FP32), "onnx" or "onnx-int8" (dynamically quantized ONNX Runtime)
+    embedding_backend: str = "torch"
+    embedding_onnx_dir: str = "./cache/embedding-onnx"
+    # LRU entries for single-text embeddings (0 disables the cache)
+    embedding_cache_size: int = 10000
+    # Concurrent query embeddings are batched within this window
+    embedding_batch_window_ms: int = 10
+    embedding_batch_max: int = 32
+    # Bulk encoding runs length-sorted micro-batches bounded by count and chars
+    embedding_micro_batch_size: int = 32
+    embedding_batch_char_budget: int = 150_000
+    # index_batch embeds in this many shards, overlapping with bulk indexing
+    embedding_pipeline_shards: int = 4
 
     # === CORS ===
     cors_origins: List[str] = [
@@ -87,6 +131,7 @@ class Settings(BaseSettings):
     )
     collector_request_timeout: int = 30
     collector_default_interval_minutes: int = 30
+    collector_max_concurrency: int = 8
 
     # === Media Proxy ===
     media_cache_dir: str = "./cache/media"
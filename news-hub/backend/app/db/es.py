@@ -5,13 +5,33 @@ Provides async Elasticsearch client with index lifecycle management.
 Supports vector search with dense_vector fields.
 """
 
-from typing import Any, Dict, List, Optional
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional, Set
 
 from elasticsearch import AsyncElasticsearch
 from loguru import logger
 
+# orjson encodes bulk bodies (and numpy embedding rows) natively in C; the
+# client only exposes OrjsonSerializer when orjson is installed.
+try:
+    from elasticsearch.serializer import OrjsonSerializer
+except ImportError:
+    OrjsonSerializer = None
+
 from app.core.config import settings
 
+# News indices are only written through bulk requests, so refresh less often
+# than the 1s default and fsync the translog on an interval, not per request.
+# MongoDB stays the source of truth; a crash loses at most the unsynced tail,
+# which a reindex restores.
+NEWS_REFRESH_INTERVAL = "5s"
+NEWS_TRANSLOG_SETTINGS = {
+    "durability": "async",
+    "sync_interval": "30s",
+    "flush_threshold_size": "1gb",
+}
+
 
 class ElasticsearchClient:
     """
@@ -22,6 +42,9 @@ class ElasticsearchClient:
 
     def __init__(self):
         self._client: Optional[AsyncElasticsearch] = None
+        # User indices known to exist; skips the exists check on hot paths
+        self._ensured_indices: Set[str] = set()
+        self._ensure_lock = asyncio.Lock()
 
     async def connect(self) -> None:
         """Establish connection to Elasticsearch."""
@@ -33,8 +56,18 @@ class ElasticsearchClient:
             "request_timeout": 30,
             "max_retries": 3,
             "retry_on_timeout": True,
+            # Keep-alive pool with room for concurrent bulk sub-batches and
+            # the bulk buffer workers next to search traffic
+            "connections_per_node": max(
+                10, settings.es_bulk_concurrency * 2 + settings.es_buffer_workers
+            ),
+            # gzip request bodies; bulk payloads with embeddings compress well
+            "http_compress": True,
         }
 
+        if OrjsonSerializer is not None:
+            es_kwargs["serializer"] = OrjsonSerializer()
+
         # Add authentication if configured
         if settings.elasticsearch_username and settings.elasticsearch_password:
             es_kwargs["basic_auth"] = (
@@ -61,6 +94,7 @@ class ElasticsearchClient:
         """Close Elasticsearch connection."""
         if self._client:
             await self._client.close()
+            self._ensured_indices.clear()
             logger.info("Elasticsearch disconnected")
 
     @property
@@ -98,6 +132,8 @@ class ElasticsearchClient:
             "settings": {
                 "number_of_shards": 1,
                 "number_of_replicas": 0,
+                "refresh_interval": NEWS_REFRESH_INTERVAL,
+                "translog": NEWS_TRANSLOG_SETTINGS,
                 "analysis": {
                     "analyzer": {
                         "ik_smart_analyzer": {
@@ -137,7 +173,13 @@ class ElasticsearchClient:
                         "analyzer": "ik_max_analyzer",
                         "search_analyzer": "ik_smart_analyzer",
                     },
-                    "content": {"type": "text", "analyzer": "ik_smart_analyzer"},
+                    # Term vectors let content highlighting use the stored
+                    # offsets instead of re-analyzing the full text per hit
+                    "content": {
+                        "type": "text",
+                        "analyzer": "ik_smart_analyzer",
+                        "term_vector": "with_positions_offsets",
+                    },
                     # Tags and metadata
                     "tags": {"type": "keyword"},
                     "image_url": {"type": "keyword", "index": False},
@@ -156,6 +198,12 @@ class ElasticsearchClient:
                         "dims": settings.embedding_dimension,
                         "index": True,
                         "similarity": "cosine",
+                        # Vectors are quantized by ES at index time
+                        "index_options": {
+                            "type": settings.embedding_index_type,
+                            "m": 16,
+                            "ef_construction": 100,
+                        },
                     },
                 }
             },
@@ -164,15 +212,55 @@ class ElasticsearchClient:
         await self._client.indices.create(index=index_name, body=mapping)
         logger.info(f"Created news index: {index_name}")
 
+    @asynccontextmanager
+    async def bulk_load(self, index_name: str) -> AsyncIterator[None]:
+        """
+        Disable refreshes on an index while a large batch is written.
+
+        On exit the news refresh interval is restored and one refresh makes
+        the batch searchable.
+
+        Args:
+            index_name: Index being loaded
+        """
+        await self._client.indices.put_settings(
+            index=index_name, settings={"index": {"refresh_interval": "-1"}}
+        )
+        try:
+            yield
+        finally:
+            await self._client.indices.put_settings(
+                index=index_name,
+                settings={"index": {"refresh_interval": NEWS_REFRESH_INTERVAL}},
+            )
+            await self._client.indices.refresh(index=index_name)
+
     async def ensure_user_index(self, user_id: str) -> str:
         """
         Ensure user's news index exists, create if needed.
 
+        Only the first call per user and process checks Elasticsearch;
+        later calls return from an in-memory set.
+
         Returns:
             str: The index name for the user
         """
-        await self.create_news_index(user_id)
-        return self.index_name(f"news_{user_id}")
+        index_name = self.index_name(f"news_{user_id}")
+        if index_name in self._ensured_indices:
+            return index_name
+        async with self._ensure_lock:
+            if index_name not in self._ensured_indices:
+                await self.create_news_index(user_id)
+                self._ensured_indices.add(index_name)
+        return index_name
+
+    def forget_user_index(self, user_id: str) -> None:
+        """
+        Drop a user's index from the known-to-exist set.
+
+        Call after deleting the index so the next write recreates it.
+        """
+        self._ensured_indices.discard(self.index_name(f"news_{user_id}"))
 
 
 # Global instance
@@ -4,10 +4,12 @@ MongoDB Connection and Collection Management
 Provides async MongoDB client using Motor and collection accessors.
 """
 
+from contextlib import suppress
 from typing import Optional
 
 from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
 from loguru import logger
+from pymongo.errors import OperationFailure
 
 from app.core.config import settings
 
@@ -34,6 +36,9 @@ class MongoDB:
         self._client = AsyncIOMotorClient(
             settings.mongodb_url,
             serverSelectionTimeoutMS=5000,
+            minPoolSize=settings.mongodb_min_pool_size,
+            maxPoolSize=settings.mongodb_max_pool_size,
+            waitQueueTimeoutMS=settings.mongodb_wait_queue_timeout_ms,
         )
         self._db = self._client[settings.mongodb_db_name]
 
@@ -84,6 +89,11 @@ class MongoDB:
         """Tag rules collection."""
         return self.db.tag_rules
 
+    @property
+    def user_tag_counts(self):
+        """Per-user tag usage counts, maintained alongside news tags."""
+        return self.db.user_tag_counts
+
     @property
     def external_search_sessions(self):
         """External search staging sessions collection."""
@@ -124,6 +134,7 @@ class MongoDB:
         await self.news.create_index("user_id")
         await self.news.create_index("source_id")
         await self.news.create_index([("user_id", 1), ("url", 1)], unique=True)
+        await self.news.create_index([("user_id", 1), ("source_id", 1), ("url", 1)])
         await self.news.create_index([("user_id", 1), ("published_at", -1)])
         await self.news.create_index([("user_id", 1), ("crawled_at", -1)])
         await self.news.create_index([("user_id", 1), ("is_starred", 1)])
@@ -140,6 +151,23 @@ class MongoDB:
         await self.tag_rules.create_index(
             [("user_id", 1), ("tag_name", 1)], unique=True
         )
+        # Serves the matcher's active-rules query in priority order
+        await self.tag_rules.create_index(
+            [("user_id", 1), ("is_active", 1), ("priority", -1), ("created_at", -1)],
+            name="rules_priority_idx",
+        )
+
+        # Tag count indexes. Counts are kept per rebuild generation, which
+        # the earlier per-(user_id, tag_name) indexes cannot hold
+        for legacy in ("user_id_1_tag_name_1", "user_id_1_count_-1"):
+            with suppress(OperationFailure):
+                await self.user_tag_counts.drop_index(legacy)
+        await self.user_tag_counts.create_index(
+            [("user_id", 1), ("gen", 1), ("tag_name", 1)], unique=True
+        )
+        await self.user_tag_counts.create_index(
+            [("user_id", 1), ("gen", 1), ("count", -1)]
+        )
 
         # External search session indexes
         await self.external_search_sessions.create_index(
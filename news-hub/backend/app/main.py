@@ -5,6 +5,7 @@ Configures the application with middleware, routers, and lifecycle events.
 """
 # RAG assistant support added
 
+import asyncio
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI, Request
@@ -21,7 +22,12 @@ from app.api.v1.news import router as news_router
 from app.api.v1.search import router as search_router
 from app.api.v1.tags import router as tags_router
 from app.api.v1.assistant import router as assistant_router
+from app.services.collector.base import close_http_client as close_collector_client
+from app.services.collector.webpage_extractor import close_http_client
 from app.services.scheduler import setup_scheduler, shutdown_scheduler
+from app.services.search.indexer import bulk_buffer
+from app.services.tagging import TagService
+from app.services.tagging.keyword_extractor import init_jieba
 
 
 @asynccontextmanager
@@ -44,6 +50,15 @@ async def lifespan(app: FastAPI):
         logger.warning(f"Elasticsearch not available: {e}")
         logger.warning("Search features will be disabled")
 
+    # Load the jieba dictionary now rather than on the first extraction
+    try:
+        await asyncio.to_thread(init_jieba)
+    except Exception as e:
+        logger.warning(f"Jieba initialization failed: {e}")
+
+    # Start buffered single-document indexing
+    bulk_buffer.start()
+
     # Start background scheduler
     setup_scheduler()
 
@@ -57,6 +72,10 @@ async def lifespan(app: FastAPI):
     # === Shutdown ===
     logger.info(f"Shutting down {settings.app_name}...")
 
+    await close_http_client()
+    await close_collector_client()
+    await bulk_buffer.aclose()
+    await TagService.flush_match_counts()
     await es_client.disconnect()
     await mongodb.disconnect()
 
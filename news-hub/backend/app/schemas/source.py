@@ -159,6 +159,14 @@ class SourceDetectRequest(BaseModel):
     url: HttpUrl = Field(..., description="URL to analyze")
 
 
+class SourceDetectBatchRequest(BaseModel):
+    """Request for auto-detecting several sources at once."""
+
+    urls: List[HttpUrl] = Field(
+        ..., min_length=1, max_length=50, description="URLs to analyze"
+    )
+
+
 class SourceDetectResponse(BaseModel):
     """Response from source auto-detection."""
 
@@ -25,13 +25,13 @@ def create_library_tools(user_id: str):
             from bson import ObjectId
 
             from app.services.search.indexer import ESIndexer
-            from app.services.tagging.rule_matcher import RuleMatcher
             from app.services.tagging.tag_service import TagService
 
             tag_service = TagService(mongodb.db)
-            rules = await tag_service.list_rules(user_id)
-            matcher = RuleMatcher(rules)
-            tags, matched_rule_ids = matcher.match(title, description)
+            matcher = await tag_service.get_matcher(user_id)
+            tags, matched_rule_ids = (
+                matcher.match(title, description) if matcher else ([], [])
+            )
             if matched_rule_ids:
                 await tag_service.increment_match_count(matched_rule_ids)
 
@@ -48,6 +48,8 @@ def create_library_tools(user_id: str):
                 "crawled_at": datetime.utcnow(),
             }
             await mongodb.db.news.insert_one(news_doc)
+            if tags:
+                await tag_service.bump_tag_counts(user_id, added=tags)
 
             if es_client.client:
                 indexer = ESIndexer(es_client.client)
@@ -55,6 +57,7 @@ def create_library_tools(user_id: str):
                     user_id=user_id,
                     news_id=str(news_doc["_id"]),
                     doc={"title": title, "url": url, "description": description, "source_name": source_name, "tags": tags},
+                    wait=False,
                 )
             return json.dumps(
                 {"success": True, "news_id": str(news_doc["_id"]), "tags": tags, "message": f"已保存: {title}"},
@@ -125,6 +128,10 @@ def create_library_tools(user_id: str):
                 return json.dumps({"success": False, "message": "未找到该订阅源"}, ensure_ascii=False)
 
             del_news = await mongodb.db.news.delete_many({"source_id": source_id, "user_id": user_id})
+            if del_news.deleted_count:
+                from app.services.tagging.tag_service import TagService
+
+                await TagService(mongodb.db).invalidate_tag_counts(user_id)
             if es_client.client:
                 from app.services.search.indexer import ESIndexer
 
@@ -160,7 +160,6 @@ class VirtualSourceManager:
                     "is_read": False,
                     "is_starred": False,
                     "read_at": None,
-                    "embedding": None,
                     "crawled_at": now,
                     "created_at": now,
                     "updated_at": now,
@@ -40,12 +40,12 @@ class APICollector(BaseCollector):
                 headers.update(api_config["headers"])
 
             # Fetch JSON
-            async with httpx.AsyncClient(
-                timeout=self.timeout, follow_redirects=True
-            ) as client:
-                response = await client.get(self.url, headers=headers)
-                response.raise_for_status()
-                data = response.json()
+            client = await self._get_client()
+            response = await client.get(
+                self.url, headers=headers, timeout=self.timeout
+            )
+            response.raise_for_status()
+            data = response.json()
 
             # Extract list of items
             list_path = api_config.get("list_path", "")
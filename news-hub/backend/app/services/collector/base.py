@@ -4,14 +4,49 @@ Base Collector Interface
 Abstract base class for all content collectors (RSS, API, HTML).
 """
 
+import asyncio
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
 from datetime import datetime
 from typing import Any, Dict, List, Optional
 
+import httpx
 from loguru import logger
 
 
+# Shared HTTP client for all collectors: feeds on the same host reuse TCP/TLS
+# connections across sources and scheduler ticks.
+_HTTP_LIMITS = httpx.Limits(
+    max_connections=64,
+    max_keepalive_connections=32,
+    keepalive_expiry=30,
+)
+_http_client: Optional[httpx.AsyncClient] = None
+_http_client_lock = asyncio.Lock()
+
+
+async def get_http_client() -> httpx.AsyncClient:
+    """Return the shared collector AsyncClient, creating it on first use."""
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        async with _http_client_lock:
+            if _http_client is None or _http_client.is_closed:
+                _http_client = httpx.AsyncClient(
+                    follow_redirects=True,
+                    limits=_HTTP_LIMITS,
+                )
+    return _http_client
+
+
+async def close_http_client() -> None:
+    """Close the shared collector AsyncClient. Call on application shutdown."""
+    global _http_client
+    async with _http_client_lock:
+        if _http_client is not None:
+            await _http_client.aclose()
+            _http_client = None
+
+
 @dataclass
 class CollectedItem:
     """Standardized news item from any source type."""
@@ -66,14 +101,21 @@ class BaseCollector(ABC):
     to provide standardized news item collection.
     """
 
-    def __init__(self, source_config: Dict[str, Any]):
+    def __init__(
+        self,
+        source_config: Dict[str, Any],
+        client: Optional[httpx.AsyncClient] = None,
+    ):
         """
         Initialize collector with source configuration.
 
         Args:
             source_config: Source document from database including URL,
                            parser_config, and other settings.
+            client: HTTP client to fetch with; defaults to the shared
+                    collector client
         """
+        self._client = client
         self.source_id = source_config.get("_id", source_config.get("id", "unknown"))
         self.user_id = source_config.get("user_id", "unknown")
         self.url = source_config.get("url", "")
@@ -85,6 +127,12 @@ class BaseCollector(ABC):
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
         }
 
+    async def _get_client(self) -> httpx.AsyncClient:
+        """Return the injected HTTP client or the shared one."""
+        if self._client is not None:
+            return self._client
+        return await get_http_client()
+
     @abstractmethod
     async def fetch(self) -> CollectionResult:
         """
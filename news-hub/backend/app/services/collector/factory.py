@@ -4,8 +4,9 @@ Collector Factory
 Creates the appropriate collector based on source type.
 """
 
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
+import httpx
 from loguru import logger
 
 from app.services.collector.base import BaseCollector, CollectionResult
@@ -27,12 +28,17 @@ class CollectorFactory:
     }
 
     @classmethod
-    def create(cls, source_config: Dict[str, Any]) -> BaseCollector:
+    def create(
+        cls,
+        source_config: Dict[str, Any],
+        client: Optional[httpx.AsyncClient] = None,
+    ) -> BaseCollector:
         """
         Create a collector instance for the given source configuration.
 
         Args:
             source_config: Source document from database
+            client: HTTP client to fetch with; defaults to the shared client
 
         Returns:
             Appropriate collector instance
@@ -50,21 +56,26 @@ class CollectorFactory:
             f"Creating {collector_class.__name__} for source: {source_config.get('name')}"
         )
 
-        return collector_class(source_config)
+        return collector_class(source_config, client=client)
 
     @classmethod
-    async def collect(cls, source_config: Dict[str, Any]) -> CollectionResult:
+    async def collect(
+        cls,
+        source_config: Dict[str, Any],
+        client: Optional[httpx.AsyncClient] = None,
+    ) -> CollectionResult:
         """
         Convenience method to create collector and fetch in one call.
 
         Args:
             source_config: Source document from database
+            client: HTTP client to fetch with; defaults to the shared client
 
         Returns:
             CollectionResult from the fetch operation
         """
         try:
-            collector = cls.create(source_config)
+            collector = cls.create(source_config, client=client)
             return await collector.fetch()
         except ValueError as e:
             return CollectionResult(
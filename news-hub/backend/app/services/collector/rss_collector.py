@@ -35,12 +35,12 @@ class RSSCollector(BaseCollector):
             logger.info(f"Fetching RSS feed: {self.url}")
 
             # Fetch feed content
-            async with httpx.AsyncClient(
-                timeout=self.timeout, follow_redirects=True
-            ) as client:
-                response = await client.get(self.url, headers=self.headers)
-                response.raise_for_status()
-                content = response.text
+            client = await self._get_client()
+            response = await client.get(
+                self.url, headers=self.headers, timeout=self.timeout
+            )
+            response.raise_for_status()
+            content = response.text
 
             # Parse with feedparser
             feed = feedparser.parse(content)
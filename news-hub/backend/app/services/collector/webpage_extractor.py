@@ -5,23 +5,388 @@ Features:
 - fit_markdown for LLM-ready clean output
 - Batch extraction via multi-URL POST
 - Overlay/popup removal, social link stripping
-- Falls back to httpx + BeautifulSoup when Crawl4AI is unavailable
+- Falls back to httpx + selectolax/BeautifulSoup when Crawl4AI is unavailable
 """
 
 from __future__ import annotations
 
+import asyncio
 import hashlib
+import re
 from datetime import datetime
-from typing import Any, Dict, List, Optional, Tuple
+from functools import lru_cache
+from html import unescape as html_unescape
+from typing import Any, Dict, List, Optional, Protocol, Tuple, Union
 from urllib.parse import parse_qsl, urlencode, urlparse, urlunparse
 
 import httpx
-from bs4 import BeautifulSoup
+import orjson
+from bs4 import BeautifulSoup, NavigableString, Tag, UnicodeDammit
 from dateutil import parser as date_parser
 from loguru import logger
 
 from app.core.config import settings
 
+# Prefer the libxml2-backed parser; html.parser keeps deploys without lxml working
+try:
+    import lxml  # noqa: F401
+
+    _HTML_PARSER = "lxml"
+except ImportError:
+    _HTML_PARSER = "html.parser"
+
+# selectolax (lexbor) is a C parser much faster than BeautifulSoup for the
+# title/meta/paragraph lookups done here; BeautifulSoup remains the fallback.
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:
+    LexborHTMLParser = None
+
+# ciso8601 parses ISO 8601 / RFC 3339 timestamps (the usual
+# article:published_time format) in C; dateutil handles everything else.
+try:
+    import ciso8601
+
+    _fast_parse_date = ciso8601.parse_datetime
+except ImportError:
+    _fast_parse_date = None
+
+# Page chrome dropped before extraction, and paragraph tags -> text prefix
+_JUNK_TAGS = frozenset(
+    {"nav", "footer", "aside", "header", "script", "style", "noscript"}
+)
+_PARAGRAPH_PREFIX = {
+    "p": "", "li": "", "h1": "## ", "h2": "## ", "h3": "## ", "h4": "## ",
+}
+
+# Article container hints, matched case-insensitively against div classes
+_ARTICLE_CLASS_RE = re.compile(r"article|content|post-body|entry", re.I)
+
+# Container bits, in preference order: first <article>, first article-like
+# <div>, first <main>, then <body>
+_IN_ARTICLE, _IN_DIV, _IN_MAIN, _IN_BODY = 1, 2, 4, 8
+
+# <link rel="canonical"> sits in <head>, almost always within the first few KB;
+# scanning that prefix is cheaper than a lookup over the whole parsed tree.
+_CANONICAL_SCAN_BYTES = 8192
+_CANONICAL_RE = re.compile(
+    r"""<link\s[^>]*?rel=(["']?)canonical\1(?=[\s/>])[^>]*?href=["']?([^"'\s>]+)""",
+    re.I,
+)
+_CANONICAL_RE_BYTES = re.compile(_CANONICAL_RE.pattern.encode(), re.I)
+
+
+def _sniff_canonical(head: Union[str, bytes]) -> Optional[str]:
+    """Return the canonical href found by regex in ``head``, if any."""
+    if isinstance(head, bytes):
+        match = _CANONICAL_RE_BYTES.search(head)
+        if match is None:
+            return None
+        try:
+            href = match.group(2).decode("ascii")
+        except UnicodeDecodeError:
+            # Non-ASCII URL in an unknown charset: let the parser decode it
+            return None
+    else:
+        match = _CANONICAL_RE.search(head)
+        if match is None:
+            return None
+        href = match.group(2)
+    return html_unescape(href)
+
+
+class HTMLTree(Protocol):
+    """Parser-agnostic view of a page, as consumed by WebpageExtractor."""
+
+    def meta_dict(self) -> Dict[str, str]: ...
+
+    def title(self) -> str: ...
+
+    def canonical(self) -> Optional[str]: ...
+
+    def paragraphs(self) -> List[str]: ...
+
+
+class _TreeBase:
+    """Paragraph walk shared by the backends; subclasses supply node hooks."""
+
+    __slots__ = ("_doc", "_head")
+
+    def __init__(self, doc: Any, head: Union[str, bytes] = "") -> None:
+        self._doc = doc
+        self._head = head
+
+    def canonical(self) -> Optional[str]:
+        """Canonical URL via the raw-HTML fastpath, else a tree lookup."""
+        return (self._head and _sniff_canonical(self._head)) or self._find_canonical()
+
+    def paragraphs(self) -> List[str]:
+        """Strip page chrome and collect paragraph/heading text of the article body.
+
+        A single pre-order walk decomposes junk subtrees as they are reached and
+        records each paragraph node with a bitmask of the candidate containers
+        it sits in; the paragraphs of the preferred container are returned.
+        """
+        found = 0
+        candidates: List[Tuple[Any, str, int]] = []
+        stack: List[Tuple[Any, int]] = [(self._root(), 0)]
+        while stack:
+            node, mask = stack.pop()
+            if node is None:
+                continue
+            tag = self._tag(node)
+            if tag in _JUNK_TAGS:
+                node.decompose()
+                continue
+            prefix = _PARAGRAPH_PREFIX.get(tag)
+            if prefix is not None:
+                candidates.append((node, prefix, mask))
+            elif tag == "article" and not found & _IN_ARTICLE:
+                found |= _IN_ARTICLE
+                mask |= _IN_ARTICLE
+            elif tag == "div" and not found & _IN_DIV:
+                classes = self._classes(node)
+                if classes and _ARTICLE_CLASS_RE.search(classes):
+                    found |= _IN_DIV
+                    mask |= _IN_DIV
+            elif tag == "main" and not found & _IN_MAIN:
+                found |= _IN_MAIN
+                mask |= _IN_MAIN
+            elif tag == "body" and not found & _IN_BODY:
+                found |= _IN_BODY
+                mask |= _IN_BODY
+            stack.extend((child, mask) for child in reversed(self._children(node)))
+
+        # No container at all: take every paragraph in the document
+        want = found & -found
+
+        paragraphs = []
+        for node, prefix, mask in candidates:
+            if want and not mask & want:
+                continue
+            text = self._text(node)
+            if len(text) > 15:
+                paragraphs.append(prefix + text)
+        return paragraphs
+
+
+class _LexborTree(_TreeBase):
+    """HTMLTree over a selectolax ``LexborHTMLParser``."""
+
+    __slots__ = ()
+
+    def meta_dict(self) -> Dict[str, str]:
+        """Collect every ``<meta>`` tag in a single pass.
+
+        Keys are the lowercased ``property`` or ``name`` attribute; the first
+        occurrence of a key wins, matching ``find()`` semantics.
+        """
+        meta: Dict[str, str] = {}
+        for node in self._doc.css("meta"):
+            attrs = node.attributes
+            key = attrs.get("property") or attrs.get("name")
+            if key:
+                meta.setdefault(key.lower(), attrs.get("content") or "")
+        return meta
+
+    def title(self) -> str:
+        node = self._doc.css_first("title")
+        return node.text(strip=True) if node is not None else ""
+
+    def _find_canonical(self) -> Optional[str]:
+        link = self._doc.css_first('link[rel="canonical"]')
+        return (link.attributes.get("href") or None) if link is not None else None
+
+    def _root(self) -> Any:
+        return self._doc.root
+
+    @staticmethod
+    def _tag(node: Any) -> str:
+        return node.tag
+
+    @staticmethod
+    def _children(node: Any) -> List[Any]:
+        children = []
+        child = node.child
+        while child is not None:
+            if child.tag[0] not in "-_":  # skip text/comment nodes
+                children.append(child)
+            child = child.next
+        return children
+
+    @staticmethod
+    def _classes(node: Any) -> Optional[str]:
+        return node.attributes.get("class")
+
+    @staticmethod
+    def _text(node: Any) -> str:
+        return node.text(strip=True)
+
+
+class _Bs4Tree(_TreeBase):
+    """HTMLTree over a ``BeautifulSoup`` document."""
+
+    __slots__ = ()
+
+    def meta_dict(self) -> Dict[str, str]:
+        """Collect every ``<meta>`` tag in a single pass (first key wins)."""
+        meta: Dict[str, str] = {}
+        for node in self._doc.find_all("meta"):
+            key = node.get("property") or node.get("name")
+            if key:
+                meta.setdefault(str(key).lower(), str(node.get("content") or ""))
+        return meta
+
+    def title(self) -> str:
+        node = self._doc.title
+        return node.string.strip() if node and node.string else ""
+
+    def _find_canonical(self) -> Optional[str]:
+        link = self._doc.find("link", attrs={"rel": "canonical"})
+        href = link.get("href") if link else None
+        return str(href) if href else None
+
+    def _root(self) -> Any:
+        return self._doc
+
+    @staticmethod
+    def _tag(node: Any) -> str:
+        return node.name
+
+    @staticmethod
+    def _children(node: Any) -> List[Any]:
+        return [c for c in node.contents if isinstance(c, Tag)]
+
+    @staticmethod
+    def _classes(node: Any) -> Optional[str]:
+        classes = node.get("class")
+        return " ".join(classes) if isinstance(classes, list) else classes
+
+    @staticmethod
+    def _text(node: Any) -> str:
+        # Single-string elements ("Share", "Read more") need no get_text
+        # subtree walk; short ones are rejected outright
+        raw = node.string
+        if type(raw) is NavigableString:
+            return raw.strip() if len(raw) > 15 else ""
+        return node.get_text(strip=True)
+
+
+def _parse_html(html: Union[str, bytes]) -> HTMLTree:
+    """Parse HTML with selectolax when available, else BeautifulSoup."""
+    if LexborHTMLParser is None:
+        return _Bs4Tree(BeautifulSoup(html, _HTML_PARSER), html[:_CANONICAL_SCAN_BYTES])
+    if isinstance(html, bytes):
+        # lexbor treats bytes as UTF-8; sniff the declared charset first
+        html = UnicodeDammit(html, is_html=True).unicode_markup or ""
+    return _LexborTree(LexborHTMLParser(html), html[:_CANONICAL_SCAN_BYTES])
+
+
+# Shared HTTP client: one connection pool for LLM and fallback page
+# fetches instead of a fresh TCP/TLS handshake per request.
+_HTTP_LIMITS = httpx.Limits(
+    max_connections=100,
+    max_keepalive_connections=50,
+    keepalive_expiry=30,
+)
+_http_client: Optional[httpx.AsyncClient] = None
+_http_client_lock = asyncio.Lock()
+
+
+async def _get_http_client() -> httpx.AsyncClient:
+    """Return the shared AsyncClient, creating it on first use.
+
+    The lock is created at import time so concurrent first callers cannot
+    each build a client; a client closed underneath us is replaced.
+    """
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        async with _http_client_lock:
+            if _http_client is None or _http_client.is_closed:
+                _http_client = httpx.AsyncClient(
+                    timeout=settings.crawl4ai_timeout,
+                    limits=_HTTP_LIMITS,
+                )
+    return _http_client
+
+
+def _crawl4ai_headers() -> Dict[str, str]:
+    """Request headers for the Crawl4AI Docker API."""
+    headers = {"Content-Type": "application/json"}
+    if settings.crawl4ai_api_token:
+        headers["Authorization"] = f"Bearer {settings.crawl4ai_api_token}"
+    return headers
+
+
+# Dedicated Crawl4AI client: auth headers live on the client (never sent to
+# third-party sites fetched through _http_client), and HTTP/2 multiplexes the
+# single-URL and batch /crawl POSTs over one connection when h2 is installed.
+try:
+    import h2  # noqa: F401
+
+    _HTTP2 = True
+except ImportError:
+    _HTTP2 = False
+
+_CRAWL4AI_LIMITS = httpx.Limits(
+    max_connections=20,
+    max_keepalive_connections=20,
+    keepalive_expiry=60,
+)
+_crawl4ai_client: Optional[httpx.AsyncClient] = None
+
+
+async def _get_crawl4ai_client() -> httpx.AsyncClient:
+    """Return the shared Crawl4AI AsyncClient, creating it on first use."""
+    global _crawl4ai_client
+    if _crawl4ai_client is None or _crawl4ai_client.is_closed:
+        async with _http_client_lock:
+            if _crawl4ai_client is None or _crawl4ai_client.is_closed:
+                _crawl4ai_client = httpx.AsyncClient(
+                    base_url=settings.crawl4ai_base_url.rstrip("/"),
+                    headers=_crawl4ai_headers(),
+                    timeout=settings.crawl4ai_timeout,
+                    limits=_CRAWL4AI_LIMITS,
+                    http2=_HTTP2,
+                )
+    return _crawl4ai_client
+
+
+async def close_http_client() -> None:
+    """Close the shared AsyncClients. Call on application shutdown."""
+    global _http_client, _crawl4ai_client
+    async with _http_client_lock:
+        clients = (_http_client, _crawl4ai_client)
+        _http_client = _crawl4ai_client = None
+    for client in clients:
+        if client is not None:
+            await client.aclose()
+
+
+@lru_cache(maxsize=8192)
+def _normalize_url(url: str) -> str:
+    parsed = urlparse(url)
+    scheme = parsed.scheme.lower() or "https"
+    netloc = parsed.netloc.lower()
+    path = parsed.path or "/"
+    query = urlencode(
+        sorted(
+            (k, v)
+            for k, v in parse_qsl(parsed.query, keep_blank_values=True)
+            if not k.lower().startswith("utm_")
+        )
+    )
+    normalized = urlunparse((scheme, netloc, path, "", query, ""))
+    return normalized.rstrip("/") if path != "/" else normalized
+
+
+# SHA-1 stays the persisted dedup key: metadata.extra.url_hash carries a
+# unique index, so switching algorithms needs a backfill migration first.
+@lru_cache(maxsize=8192)
+def _url_hash(url: str) -> str:
+    return hashlib.sha1(url.encode("utf-8")).hexdigest()
+
+
 # Crawl4AI Docker API: browser_config with stealth for anti-bot bypass
 # NOTE: extra_args MUST include --no-sandbox and --disable-dev-shm-usage
 # because per-request browser_config overrides container defaults entirely.
@@ -88,13 +453,30 @@ _LLM_FORMAT_INSTRUCTION = (
 class WebpageExtractor:
     """Full-text extraction powered by Crawl4AI Docker REST API."""
 
-    DATE_META_KEYS = [
+    # Stateless: instances are created per request and carry no attributes
+    __slots__ = ()
+
+    DATE_META_KEYS = (
         "article:published_time",
         "og:published_time",
         "publishdate",
         "pubdate",
         "date",
-    ]
+    )
+
+    # Priority-ordered meta keys per extracted field, resolved against the
+    # single-pass dict from HTMLTree.meta_dict (one lookup per candidate key)
+    _TITLE_SELECTORS = ("og:title", "title")
+    _DESC_SELECTORS = ("description", "og:description", "twitter:description")
+    _AUTHOR_SELECTORS = ("author", "article:author", "parsely-author")
+    _IMAGE_SELECTORS = ("og:image", "twitter:image")
+
+    # When Crawl4AI metadata carries all of these, the HTML need not be parsed
+    _META_COMPLETE_KEYS = ("og:title", "og:description", "og:image", "og:url")
+
+    # Crawl4AI batch fan-out: URLs per POST and max POSTs in flight
+    BATCH_CHUNK = 20
+    MAX_CONCURRENT_BATCHES = 4
 
     async def extract(self, url: str) -> Dict[str, Any]:
         """Extract structured content from a webpage URL.
@@ -135,53 +517,74 @@ class WebpageExtractor:
             logger.warning(f"Fallback extraction also failed for {url}: {e}")
             return {}
 
-    async def _crawl_phase1_only(self, url: str) -> Dict[str, Any]:
-        """Phase 1 only: Crawl4AI fast crawl, return fit_markdown directly."""
-        base_url = settings.crawl4ai_base_url.rstrip("/")
-        headers = {"Content-Type": "application/json"}
-        if settings.crawl4ai_api_token:
-            headers["Authorization"] = f"Bearer {settings.crawl4ai_api_token}"
+    async def check_health(self) -> Dict[str, Any]:
+        """Probe the Crawl4AI ``/health`` endpoint over the shared client.
+
+        Returns:
+            The decoded health payload; raises on connection or HTTP errors.
+        """
+        client = await _get_crawl4ai_client()
+        resp = await client.get("/health", timeout=5)
+        resp.raise_for_status()
+        return orjson.loads(resp.content)
+
+    async def _crawl_single(self, url: str, tag: str) -> Optional[Tuple[Dict[str, Any], str]]:
+        """Phase 1 crawl shared by extract() and extract_light().
 
+        Returns the Crawl4AI result item and its picked markdown, or None when
+        the crawl failed or the server answered with a block page.
+        """
         payload = {
             "urls": [url],
             "browser_config": _BROWSER_CONFIG,
             "crawler_config": _CRAWLER_CONFIG,
         }
 
-        logger.debug(f"[crawl4ai-light] crawling {url}")
-        async with httpx.AsyncClient(timeout=settings.crawl4ai_timeout) as client:
-            resp = await client.post(f"{base_url}/crawl", json=payload, headers=headers)
-            resp.raise_for_status()
+        logger.debug(f"[{tag}] Phase 1: crawling {url}")
+        client = await _get_crawl4ai_client()
+        resp = await client.post("/crawl", json=payload)
+        resp.raise_for_status()
 
-        data = resp.json()
+        data = orjson.loads(resp.content)
         if not data.get("success") or not data.get("results"):
-            return {}
+            logger.warning(f"Crawl4AI API returned no results for {url}")
+            return None
 
         item = data["results"][0]
         if not item.get("success"):
-            return {}
+            logger.warning(f"Crawl4AI crawl failed for {url}: {item.get('error_message')}")
+            return None
 
+        # Detect server-side blocks
         status_code = item.get("status_code", 200)
         content = self._pick_markdown(item)
         if status_code in (403, 429, 451, 503) and len(content) < 100:
-            return {}
+            logger.warning(f"Crawl4AI got HTTP {status_code} with no useful content for {url}")
+            return None
 
-        logger.debug(f"[crawl4ai-light] done: {len(content)} chars for {url}")
+        logger.debug(f"[{tag}] Phase 1 done: {len(content)} chars for {url}")
+        return item, content
+
+    async def _crawl_phase1_only(self, url: str) -> Dict[str, Any]:
+        """Phase 1 only: Crawl4AI fast crawl, return fit_markdown directly."""
+        crawled = await self._crawl_single(url, "crawl4ai-light")
+        if crawled is None:
+            return {}
+        item, content = crawled
 
         # Extract metadata from HTML (lightweight, no Phase 2 LLM)
         meta = item.get("metadata") or {}
-        html = item.get("html") or item.get("cleaned_html") or ""
-        soup = BeautifulSoup(html, "html.parser") if html else None
+        soup, page_meta = self._parse_item_html(item)
 
         title = (
             meta.get("og:title") or meta.get("title") or ""
-        ).strip() or (self._extract_title(soup) if soup else "")
+        ).strip() or self._extract_title(soup, page_meta)
         description = (
             meta.get("og:description") or meta.get("description") or ""
-        ).strip()[:500] or (self._extract_description(soup, content) if soup else content[:500])
+        ).strip()[:500] or self._extract_description(page_meta, content)
         canonical_url = self.normalize_url(
             (meta.get("og:url") or "").strip()
-            or (self._extract_canonical_url(soup, url) if soup else url)
+            or (self._extract_canonical_url(soup, url) if soup is not None else url)
         )
 
         return {
@@ -198,41 +601,11 @@ class WebpageExtractor:
         Phase 1: Crawl4AI /crawl (no LLM) → fit_markdown (~3-8s)
         Phase 2: Claude Haiku formats fit_markdown → clean Markdown (~5-15s)
         """
-        base_url = settings.crawl4ai_base_url.rstrip("/")
-        headers = {"Content-Type": "application/json"}
-        if settings.crawl4ai_api_token:
-            headers["Authorization"] = f"Bearer {settings.crawl4ai_api_token}"
-
-        payload = {
-            "urls": [url],
-            "browser_config": _BROWSER_CONFIG,
-            "crawler_config": _CRAWLER_CONFIG,
-        }
-
         # --- Phase 1: Fast crawl (no LLM) ---
-        logger.debug(f"[crawl4ai] Phase 1: crawling {url}")
-        async with httpx.AsyncClient(timeout=settings.crawl4ai_timeout) as client:
-            resp = await client.post(f"{base_url}/crawl", json=payload, headers=headers)
-            resp.raise_for_status()
-
-        data = resp.json()
-        if not data.get("success") or not data.get("results"):
-            logger.warning(f"Crawl4AI API returned no results for {url}")
-            return {}
-
-        item = data["results"][0]
-        if not item.get("success"):
-            logger.warning(f"Crawl4AI crawl failed for {url}: {item.get('error_message')}")
+        crawled = await self._crawl_single(url, "crawl4ai")
+        if crawled is None:
             return {}
-
-        # Detect server-side blocks
-        status_code = item.get("status_code", 200)
-        content = self._pick_markdown(item)
-        if status_code in (403, 429, 451, 503) and len(content) < 100:
-            logger.warning(f"Crawl4AI got HTTP {status_code} with no useful content for {url}")
-            return {}
-
-        logger.debug(f"[crawl4ai] Phase 1 done: {len(content)} chars for {url}")
+        item, content = crawled
 
         # --- Phase 2: LLM formatting (only if content is substantial) ---
         if len(content) >= 200:
@@ -244,29 +617,25 @@ class WebpageExtractor:
             except Exception as e:
                 logger.warning(f"[crawl4ai] Phase 2 LLM formatting failed, using raw: {e}")
 
-        # Extract metadata from HTML
+        # Extract metadata, parsing the HTML only for fields Crawl4AI left unresolved
         meta = item.get("metadata") or {}
-        html = item.get("html") or item.get("cleaned_html") or ""
-        soup = BeautifulSoup(html, "html.parser") if html else None
+        published_at = self._extract_published_at(meta)
+        soup, page_meta = self._parse_item_html(item, force=published_at is None)
 
         title = (
             meta.get("og:title") or meta.get("title") or ""
-        ).strip() or (self._extract_title(soup) if soup else "")
+        ).strip() or self._extract_title(soup, page_meta)
         description = (
             meta.get("og:description") or meta.get("description") or ""
-        ).strip()[:500] or (self._extract_description(soup, content) if soup else content[:500])
-        published_at = self._parse_date(meta.get("article:published_time")) or (
-            self._extract_published_at(soup) if soup else None
-        )
+        ).strip()[:500] or self._extract_description(page_meta, content)
+        published_at = published_at or self._extract_published_at(page_meta)
         author = (
             meta.get("article:author") or meta.get("author") or ""
-        ).strip()[:100] or (self._extract_author(soup) if soup else None)
-        image_url = (
-            meta.get("og:image") or ""
-        ).strip() or (self._extract_image(soup) if soup else None)
+        ).strip()[:100] or self._extract_author(page_meta)
+        image_url = (meta.get("og:image") or "").strip() or self._extract_image(page_meta)
         canonical_url = (
             meta.get("og:url") or ""
-        ).strip() or (self._extract_canonical_url(soup, url) if soup else self.normalize_url(url))
+        ).strip() or (self._extract_canonical_url(soup, url) if soup is not None else self.normalize_url(url))
         canonical_url = self.normalize_url(canonical_url)
         quality_score = self._quality_score(content, title, description)
 
@@ -304,13 +673,14 @@ class WebpageExtractor:
             "anthropic-version": "2023-06-01",
         }
 
-        async with httpx.AsyncClient(timeout=60) as client:
-            resp = await client.post(
-                f"{settings.llm_api_base}/v1/messages",
-                json=payload,
-                headers=headers,
-            )
-            resp.raise_for_status()
+        client = await _get_http_client()
+        resp = await client.post(
+            f"{settings.llm_api_base}/v1/messages",
+            json=payload,
+            headers=headers,
+            timeout=60,
+        )
+        resp.raise_for_status()
 
         data = resp.json()
         text_blocks = [b["text"] for b in data.get("content", []) if b.get("type") == "text"]
@@ -334,65 +704,62 @@ class WebpageExtractor:
             return fit
         return (str(md) if md else "").strip()
 
-    _FALLBACK_UAS = [
+    _FALLBACK_UAS = (
         # Mobile UA — many sites (Zhihu, Weibo) are less strict on mobile
         "Mozilla/5.0 (iPhone; CPU iPhone OS 17_0 like Mac OS X) "
         "AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.0 Mobile/15E148 Safari/604.1",
         # Desktop UA
         "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
         "AppleWebKit/537.36 (KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36",
-    ]
+    )
+
+    async def _try_ua(self, url: str, ua: str) -> bytes:
+        """Fetch a page with a single User-Agent; raises on HTTP errors."""
+        client = await _get_http_client()
+        logger.debug(f"[fallback] httpx 抓取: {url} (UA={ua[:30]}...)")
+        resp = await client.get(
+            url, headers={"User-Agent": ua},
+            follow_redirects=True, timeout=15.0,
+        )
+        resp.raise_for_status()
+        # Raw bytes let lxml sniff the charset from <meta> itself
+        return resp.content
 
     async def _fallback_extract(self, url: str) -> Dict[str, Any]:
         """Lightweight fallback: httpx GET + BeautifulSoup text extraction.
 
-        Tries mobile UA first (less anti-bot), then desktop UA.
+        Races the mobile UA (less anti-bot) and desktop UA in parallel and
+        keeps the first successful response.
         """
         last_err: Optional[Exception] = None
-        for ua in self._FALLBACK_UAS:
-            try:
-                logger.debug(f"[fallback] httpx 抓取: {url} (UA={ua[:30]}...)")
-                async with httpx.AsyncClient(
-                    follow_redirects=True, timeout=15.0,
-                    headers={"User-Agent": ua},
-                ) as client:
-                    resp = await client.get(url)
-                    resp.raise_for_status()
-                html = resp.text
-                break
-            except httpx.HTTPStatusError as e:
-                last_err = e
-                logger.debug(f"[fallback] HTTP {e.response.status_code} with UA={ua[:30]}...")
-                continue
-        else:
+        html: Optional[bytes] = None
+        tasks = [asyncio.create_task(self._try_ua(url, ua)) for ua in self._FALLBACK_UAS]
+        try:
+            for fut in asyncio.as_completed(tasks):
+                try:
+                    html = await fut
+                    break
+                except httpx.HTTPStatusError as e:
+                    last_err = e
+                    logger.debug(f"[fallback] HTTP {e.response.status_code} for {url}")
+                except httpx.HTTPError as e:
+                    last_err = e
+                    logger.debug(f"[fallback] {type(e).__name__} for {url}")
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+        if html is None:
             raise last_err or RuntimeError(f"All fallback UAs failed for {url}")
-        soup = BeautifulSoup(html, "html.parser")
-
-        for tag in soup.find_all(["nav", "footer", "aside", "header", "script", "style", "noscript"]):
-            tag.decompose()
-
-        article = (
-            soup.find("article")
-            or soup.find("div", class_=lambda c: c and any(k in (c if isinstance(c, str) else " ".join(c)) for k in ["article", "content", "post-body", "entry"]))
-            or soup.find("main")
-        )
-        text_source = article if article else soup.body or soup
-
-        paragraphs = []
-        for p in text_source.find_all(["p", "h1", "h2", "h3", "h4", "li"]):
-            text = p.get_text(strip=True)
-            if len(text) > 15:
-                if p.name and p.name.startswith("h"):
-                    paragraphs.append(f"## {text}")
-                else:
-                    paragraphs.append(text)
-        content = "\n\n".join(paragraphs)
-
-        title = self._extract_title(soup)
-        description = self._extract_description(soup, content)
-        published_at = self._extract_published_at(soup)
-        author = self._extract_author(soup)
-        image_url = self._extract_image(soup)
+        soup = _parse_html(html)
+        page_meta = soup.meta_dict()
+        content = "\n\n".join(soup.paragraphs())
+
+        title = self._extract_title(soup, page_meta)
+        description = self._extract_description(page_meta, content)
+        published_at = self._extract_published_at(page_meta)
+        author = self._extract_author(page_meta)
+        image_url = self._extract_image(page_meta)
         canonical_url = self._extract_canonical_url(soup, url)
         quality_score = self._quality_score(content, title, description)
 
@@ -411,138 +778,172 @@ class WebpageExtractor:
     async def batch_extract(self, urls: List[str]) -> List[Tuple[str, Dict[str, Any]]]:
         """Batch-extract multiple URLs via Crawl4AI Docker API.
 
+        URLs are split into chunks of ``BATCH_CHUNK`` and posted with at most
+        ``MAX_CONCURRENT_BATCHES`` requests in flight, so one slow or failed
+        chunk does not take the whole batch down with it.
+
         Returns list of (url, extracted_dict) tuples.
         """
         if not urls:
             return []
 
-        base_url = settings.crawl4ai_base_url.rstrip("/")
-        headers = {"Content-Type": "application/json"}
-        if settings.crawl4ai_api_token:
-            headers["Authorization"] = f"Bearer {settings.crawl4ai_api_token}"
+        client = await _get_crawl4ai_client()
+        sem = asyncio.Semaphore(self.MAX_CONCURRENT_BATCHES)
+
+        async def post_chunk(chunk: List[str]) -> List[Dict[str, Any]]:
+            payload = {
+                "urls": chunk,
+                "browser_config": _BROWSER_CONFIG,
+                "crawler_config": _CRAWLER_CONFIG,
+            }
+            async with sem:
+                resp = await client.post(
+                    "/crawl", json=payload, timeout=settings.crawl4ai_timeout * 2,
+                )
+                resp.raise_for_status()
+            data = orjson.loads(resp.content)
+            if not data.get("success"):
+                return []
+            return data.get("results") or []
+
+        chunks = [
+            urls[i:i + self.BATCH_CHUNK] for i in range(0, len(urls), self.BATCH_CHUNK)
+        ]
+        chunk_results = await asyncio.gather(
+            *(post_chunk(chunk) for chunk in chunks), return_exceptions=True
+        )
 
-        payload = {
-            "urls": urls,
-            "browser_config": _BROWSER_CONFIG,
-            "crawler_config": _CRAWLER_CONFIG,
-        }
+        output: List[Tuple[str, Dict[str, Any]]] = []
+        for chunk, results in zip(chunks, chunk_results):
+            if isinstance(results, BaseException):
+                logger.error(f"Batch crawl API failed for {len(chunk)} URLs: {results}")
+                output.extend((url, {}) for url in chunk)
+            elif not results:
+                output.extend((url, {}) for url in chunk)
+            else:
+                output.extend(self._process_batch_item(item) for item in results)
 
-        try:
-            async with httpx.AsyncClient(timeout=settings.crawl4ai_timeout * 2) as client:
-                resp = await client.post(f"{base_url}/crawl", json=payload, headers=headers)
-                resp.raise_for_status()
-            data = resp.json()
-        except Exception as e:
-            logger.error(f"Batch crawl API failed: {e}")
-            return [(url, {}) for url in urls]
+        return output
 
-        if not data.get("success") or not data.get("results"):
-            return [(url, {}) for url in urls]
+    def _parse_item_html(
+        self, item: Dict[str, Any], force: bool = False
+    ) -> Tuple[Optional[HTMLTree], Dict[str, str]]:
+        """Parse a Crawl4AI item's HTML unless its metadata already suffices.
 
-        output: List[Tuple[str, Dict[str, Any]]] = []
-        for item in data["results"]:
-            item_url = item.get("url", "")
-            if not item.get("success"):
-                logger.warning(f"Batch item failed ({item_url}): {item.get('error_message')}")
-                output.append((item_url, {}))
-                continue
+        Returns ``(None, {})`` when the item has no HTML, or when its
+        ``metadata`` carries every ``_META_COMPLETE_KEYS`` field and the
+        caller does not ``force`` a parse (e.g. for a missing date).
+        """
+        meta = item.get("metadata") or {}
+        if not force and all(meta.get(k) for k in self._META_COMPLETE_KEYS):
+            return None, {}
+        html = item.get("html") or item.get("cleaned_html") or ""
+        if not html:
+            return None, {}
+        soup = _parse_html(html)
+        return soup, soup.meta_dict()
+
+    def _process_batch_item(self, item: Dict[str, Any]) -> Tuple[str, Dict[str, Any]]:
+        """Turn one Crawl4AI batch result into a (url, extracted_dict) pair."""
+        item_url = item.get("url", "")
+        if not item.get("success"):
+            logger.warning(f"Batch item failed ({item_url}): {item.get('error_message')}")
+            return item_url, {}
 
-            try:
-                content = self._pick_markdown(item)
-                html = item.get("html") or item.get("cleaned_html") or ""
-                soup = BeautifulSoup(html, "html.parser") if html else None
-
-                title = self._extract_title(soup) if soup else ""
-                description = self._extract_description(soup, content) if soup else content[:500]
-                published_at = self._extract_published_at(soup) if soup else None
-                author = self._extract_author(soup) if soup else None
-                image_url = self._extract_image(soup) if soup else None
-                canonical_url = self._extract_canonical_url(soup, item_url) if soup else self.normalize_url(item_url)
-                quality_score = self._quality_score(content, title, description)
-
-                output.append((item_url, {
-                    "title": title,
-                    "description": description,
-                    "content": content,
-                    "author": author,
-                    "image_url": image_url,
-                    "published_at": published_at,
-                    "canonical_url": canonical_url,
-                    "url_hash": self.url_hash(canonical_url),
-                    "quality_score": quality_score,
-                }))
-            except Exception as e:
-                logger.warning(f"Batch post-processing failed for {item_url}: {e}")
-                output.append((item_url, {}))
+        try:
+            content = self._pick_markdown(item)
+            meta = item.get("metadata") or {}
+            soup, page_meta = self._parse_item_html(
+                item, force=self._extract_published_at(meta) is None
+            )
+            page_meta.update(
+                (k.lower(), v) for k, v in meta.items() if isinstance(v, str) and v
+            )
 
-        return output
+            title = self._extract_title(soup, page_meta)
+            description = self._extract_description(page_meta, content)
+            published_at = self._extract_published_at(page_meta)
+            author = self._extract_author(page_meta)
+            image_url = self._extract_image(page_meta)
+            canonical_url = (
+                self._extract_canonical_url(soup, item_url)
+                if soup is not None
+                else self.normalize_url(page_meta.get("og:url") or item_url)
+            )
+            quality_score = self._quality_score(content, title, description)
+
+            return item_url, {
+                "title": title,
+                "description": description,
+                "content": content,
+                "author": author,
+                "image_url": image_url,
+                "published_at": published_at,
+                "canonical_url": canonical_url,
+                "url_hash": self.url_hash(canonical_url),
+                "quality_score": quality_score,
+            }
+        except Exception as e:
+            logger.warning(f"Batch post-processing failed for {item_url}: {e}")
+            return item_url, {}
+
+    @staticmethod
+    def _resolve_meta(
+        meta: Dict[str, str], keys: Tuple[str, ...], limit: Optional[int] = None
+    ) -> Optional[str]:
+        """Return the first non-empty meta value among ``keys``, in order."""
+        for key in keys:
+            value = meta.get(key)
+            if value:
+                value = value.strip()
+                return value[:limit] if limit else value
+        return None
+
+    def _extract_title(self, soup: Optional[HTMLTree], meta: Dict[str, str]) -> str:
+        title = soup.title() if soup is not None else ""
+        return title or self._resolve_meta(meta, self._TITLE_SELECTORS) or ""
 
-    def _extract_title(self, soup: BeautifulSoup) -> str:
-        if soup.title and soup.title.string:
-            return soup.title.string.strip()
-        meta = soup.find("meta", attrs={"property": "og:title"})
-        if meta and meta.get("content"):
-            return str(meta["content"]).strip()
-        return ""
-
-    def _extract_description(self, soup: BeautifulSoup, article_text: str) -> str:
-        for attrs in [
-            {"name": "description"},
-            {"property": "og:description"},
-            {"name": "twitter:description"},
-        ]:
-            meta = soup.find("meta", attrs=attrs)
-            if meta and meta.get("content"):
-                return str(meta["content"]).strip()[:500]
+    def _extract_description(self, meta: Dict[str, str], article_text: str) -> str:
+        description = self._resolve_meta(meta, self._DESC_SELECTORS, 500)
+        if description:
+            return description
         return article_text[:500] if article_text else ""
 
-    def _extract_published_at(self, soup: BeautifulSoup) -> Optional[datetime]:
+    def _extract_published_at(self, meta: Dict[str, Any]) -> Optional[datetime]:
+        """Return the first parseable date among ``DATE_META_KEYS``.
+
+        Works on both the page meta dict and Crawl4AI's ``metadata``, which
+        share the same lowercase ``og:``/``article:`` keys.
+        """
         for key in self.DATE_META_KEYS:
-            meta = soup.find("meta", attrs={"property": key}) or soup.find(
-                "meta", attrs={"name": key}
-            )
-            if not meta or not meta.get("content"):
-                continue
-            dt = self._parse_date(str(meta["content"]))
+            dt = self._parse_date(meta.get(key))
             if dt:
                 return dt
         return None
 
     @staticmethod
     def _parse_date(value: Optional[str]) -> Optional[datetime]:
-        if not value or not value.strip():
+        if not isinstance(value, str) or not value.strip():
             return None
+        value = value.strip()
+        if _fast_parse_date is not None:
+            try:
+                return _fast_parse_date(value)
+            except ValueError:
+                pass
         try:
-            return date_parser.parse(value.strip())
+            return date_parser.parse(value)
         except Exception:
             return None
 
-    def _extract_author(self, soup: BeautifulSoup) -> Optional[str]:
-        for attrs in [
-            {"name": "author"},
-            {"property": "article:author"},
-            {"name": "parsely-author"},
-        ]:
-            meta = soup.find("meta", attrs=attrs)
-            if meta and meta.get("content"):
-                return str(meta["content"]).strip()[:100]
-        return None
+    def _extract_author(self, meta: Dict[str, str]) -> Optional[str]:
+        return self._resolve_meta(meta, self._AUTHOR_SELECTORS, 100)
 
-    def _extract_image(self, soup: BeautifulSoup) -> Optional[str]:
-        for attrs in [
-            {"property": "og:image"},
-            {"name": "twitter:image"},
-        ]:
-            meta = soup.find("meta", attrs=attrs)
-            if meta and meta.get("content"):
-                return str(meta["content"]).strip()
-        return None
+    def _extract_image(self, meta: Dict[str, str]) -> Optional[str]:
+        return self._resolve_meta(meta, self._IMAGE_SELECTORS)
 
-    def _extract_canonical_url(self, soup: BeautifulSoup, fallback_url: str) -> str:
-        link = soup.find("link", attrs={"rel": "canonical"})
-        if link and link.get("href"):
-            return self.normalize_url(str(link["href"]))
-        return self.normalize_url(fallback_url)
+    def _extract_canonical_url(self, soup: HTMLTree, fallback_url: str) -> str:
+        return self.normalize_url(soup.canonical() or fallback_url)
 
     def _quality_score(self, content: str, title: str, description: str) -> float:
         score = 0.0
@@ -559,22 +960,6 @@ class WebpageExtractor:
         score += 0.2 if "\n" in content else 0.05
         return round(min(score, 1.0), 3)
 
-    @classmethod
-    def normalize_url(cls, url: str) -> str:
-        parsed = urlparse(url)
-        scheme = parsed.scheme.lower() or "https"
-        netloc = parsed.netloc.lower()
-        path = parsed.path or "/"
-        query = urlencode(
-            sorted(
-                (k, v)
-                for k, v in parse_qsl(parsed.query, keep_blank_values=True)
-                if not k.lower().startswith("utm_")
-            )
-        )
-        normalized = urlunparse((scheme, netloc, path, "", query, ""))
-        return normalized.rstrip("/") if path != "/" else normalized
-
-    @classmethod
-    def url_hash(cls, url: str) -> str:
-        return hashlib.sha1(url.encode("utf-8")).hexdigest()
+    # Pure functions hit repeatedly for the same URL (dedup, canonical, store)
+    normalize_url = staticmethod(_normalize_url)
+    url_hash = staticmethod(_url_hash)
@@ -4,15 +4,22 @@ News Processing Pipeline
 Handles storage, deduplication, and source stats updates for collected news items.
 """
 
-from datetime import datetime
+import asyncio
+from datetime import datetime, timedelta
 from typing import Any, Dict, List, Optional, Tuple
 
 from bson import ObjectId
 from loguru import logger
 from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
 
+from app.core.config import settings
+from app.db.es import es_client
+from app.services.collector import CollectorFactory
 from app.services.collector.base import CollectedItem, CollectionResult
-from app.services.tagging import RuleMatcher
+from app.services.search.indexer import ESIndexer
+from app.services.tagging import TagService
 
 
 class NewsPipeline:
@@ -25,6 +32,9 @@ class NewsPipeline:
     - Update source statistics
     """
 
+    # Upsert batch size; chunks are written concurrently
+    INSERT_CHUNK = 50
+
     def __init__(self, db: AsyncIOMotorDatabase):
         """
         Initialize pipeline with database connection.
@@ -33,13 +43,17 @@ class NewsPipeline:
             db: Async MongoDB database instance
         """
         self.db = db
-        self._tag_rules_cache: Dict[str, List[Dict[str, Any]]] = {}
-        self._cache_ttl = 300  # 5 minutes
+        # Stored docs awaiting a shared embedding pass, keyed by user ID
+        self._pending_index: Dict[str, List[Dict[str, Any]]] = {}
+        # Source status writes awaiting a single bulk_write
+        self._pending_source_updates: List[UpdateOne] = []
 
     async def process(
         self,
         source_doc: Dict[str, Any],
         result: CollectionResult,
+        defer_indexing: bool = False,
+        defer_source_updates: bool = False,
     ) -> Tuple[int, int]:
         """
         Process collection result and store new items.
@@ -47,6 +61,10 @@ class NewsPipeline:
         Args:
             source_doc: Source document from database
             result: CollectionResult from collector
+            defer_indexing: Queue stored items for ``flush_index`` instead of
+                indexing them to Elasticsearch right away
+            defer_source_updates: Queue the source status update for
+                ``flush_source_updates`` instead of writing it right away
 
         Returns:
             Tuple of (items_stored, items_duplicated)
@@ -58,81 +76,126 @@ class NewsPipeline:
 
         if not result.success:
             # Update source with error status
-            await self._update_source_error(source_doc, result.error_message)
+            await self._update_source_error(
+                source_doc, result.error_message, defer=defer_source_updates
+            )
             return 0, 0
 
         if not result.items:
             # No items but success (empty feed)
-            await self._update_source_success(source_doc, 0)
+            await self._update_source_success(
+                source_doc, 0, defer=defer_source_updates
+            )
             return 0, 0
 
-        # Get existing URLs for deduplication
-        existing_urls = await self._get_existing_urls(user_id, source_id)
-
-        # Filter out duplicates and prepare documents
+        # Prepare documents, dropping repeats within the batch; one
+        # timestamp per batch
+        now = datetime.utcnow()
+        seen_urls = set()
         new_items = []
-        duplicates = 0
 
         for item in result.items:
-            if item.url in existing_urls:
-                duplicates += 1
+            if item.url in seen_urls:
                 continue
-
-            doc = self._item_to_document(
-                item=item,
-                user_id=user_id,
-                source_id=source_id,
-                source_name=source_name,
-                source_type=source_type,
+            seen_urls.add(item.url)
+            new_items.append(
+                self._item_to_document(
+                    item, user_id, source_id, source_name, source_type, now
+                )
             )
-            new_items.append(doc)
-            existing_urls.add(item.url)  # Prevent duplicates within batch
 
-        # Bulk insert new items
+        duplicates = len(result.items) - len(new_items)
+
+        # Upsert items; MongoDB skips URLs already stored for the user
         stored = 0
         stored_docs = []
         if new_items:
             # Apply auto-tagging before insert
             await self._apply_auto_tags(user_id, new_items)
 
-            try:
-                result_insert = await self.db.news.insert_many(new_items, ordered=False)
-                stored = len(result_insert.inserted_ids)
-                # Add IDs to docs for ES indexing
-                for i, doc in enumerate(new_items):
-                    if i < len(result_insert.inserted_ids):
-                        doc["_id"] = result_insert.inserted_ids[i]
-                        stored_docs.append(doc)
+            chunks = [
+                new_items[i:i + self.INSERT_CHUNK]
+                for i in range(0, len(new_items), self.INSERT_CHUNK)
+            ]
+            upserted = await asyncio.gather(
+                *(self._upsert_chunk(chunk) for chunk in chunks),
+                return_exceptions=True,
+            )
+            for outcome in upserted:
+                if isinstance(outcome, BaseException):
+                    logger.error(f"Error inserting news items: {outcome}")
+                    continue
+                chunk_docs, matched = outcome
+                stored_docs.extend(chunk_docs)
+                duplicates += matched
+            stored = len(stored_docs)
+            if stored:
                 logger.info(f"Stored {stored} new items for source '{source_name}'")
-            except Exception as e:
-                logger.error(f"Error inserting news items: {e}")
-                # Partial success is still possible with ordered=False
+                await TagService(self.db).bump_tag_counts(
+                    user_id,
+                    added=[tag for doc in stored_docs for tag in doc.get("tags", ())],
+                )
 
         # Index to Elasticsearch (async, non-blocking)
         if stored_docs:
-            await self._index_to_elasticsearch(user_id, stored_docs)
+            if defer_indexing:
+                self._pending_index.setdefault(user_id, []).extend(stored_docs)
+            else:
+                await self._index_to_elasticsearch({user_id: stored_docs})
 
         # Update source statistics
-        await self._update_source_success(source_doc, stored)
+        await self._update_source_success(
+            source_doc, stored, defer=defer_source_updates
+        )
 
         return stored, duplicates
 
-    async def _get_existing_urls(self, user_id: str, source_id: str) -> set:
+    async def _upsert_chunk(
+        self, docs: List[Dict[str, Any]]
+    ) -> Tuple[List[Dict[str, Any]], int]:
         """
-        Get set of existing news URLs for deduplication.
+        Insert one chunk of news documents unless their URL is already stored.
+
+        Each document becomes an upsert on (user_id, url), the unique news
+        index, that only sets fields on insert; deduplication happens on the
+        server in the same round trip as the write. With ``ordered=False``
+        the rest of the chunk is still written when some documents fail.
 
         Args:
-            user_id: User ID
-            source_id: Source ID
+            docs: Documents to insert
 
         Returns:
-            Set of URL strings
+            Tuple of (documents stored with ``_id`` set, already-stored count)
         """
-        cursor = self.db.news.find(
-            {"user_id": user_id, "source_id": source_id}, {"url": 1}
-        )
-        docs = await cursor.to_list(length=10000)
-        return {doc["url"] for doc in docs}
+        ops = [
+            UpdateOne(
+                {"user_id": doc["user_id"], "url": doc["url"]},
+                {"$setOnInsert": doc},
+                upsert=True,
+            )
+            for doc in docs
+        ]
+        try:
+            result = await self.db.news.bulk_write(
+                ops, ordered=False, bypass_document_validation=True
+            )
+            upserted_ids = result.upserted_ids
+            matched = result.matched_count
+        except BulkWriteError as e:
+            details = e.details
+            logger.warning(
+                f"{len(details.get('writeErrors', []))} of {len(docs)} "
+                f"news items failed to insert"
+            )
+            upserted_ids = {up["index"]: up["_id"] for up in details.get("upserted", [])}
+            matched = details.get("nMatched", 0)
+
+        stored = []
+        for index, upserted_id in sorted(upserted_ids.items()):
+            doc = docs[index]
+            doc["_id"] = upserted_id
+            stored.append(doc)
+        return stored, matched
 
     def _item_to_document(
         self,
@@ -141,6 +204,7 @@ class NewsPipeline:
         source_id: str,
         source_name: str,
         source_type: str,
+        now: Optional[datetime] = None,
     ) -> Dict[str, Any]:
         """
         Convert CollectedItem to MongoDB document.
@@ -151,11 +215,13 @@ class NewsPipeline:
             source_id: Source ID
             source_name: Source display name
             source_type: Source type (rss/api/html)
+            now: Timestamp for crawled/created/updated (defaults to utcnow)
 
         Returns:
             Document ready for insertion
         """
-        now = datetime.utcnow()
+        if now is None:
+            now = datetime.utcnow()
 
         return {
             "user_id": user_id,
@@ -181,7 +247,6 @@ class NewsPipeline:
             "is_read": False,
             "is_starred": False,
             "read_at": None,
-            "embedding": None,  # Will be populated by search service in Slice 4
             "crawled_at": now,
             "created_at": now,
             "updated_at": now,
@@ -191,6 +256,7 @@ class NewsPipeline:
         self,
         source_doc: Dict[str, Any],
         new_items_count: int,
+        defer: bool = False,
     ) -> None:
         """
         Update source document after successful collection.
@@ -198,12 +264,13 @@ class NewsPipeline:
         Args:
             source_doc: Source document
             new_items_count: Number of new items stored
+            defer: Queue the write for ``flush_source_updates``
         """
         source_id = source_doc["_id"]
         now = datetime.utcnow()
 
-        await self.db.sources.update_one(
-            {"_id": source_id},
+        await self._write_source_update(
+            source_id,
             {
                 "$set": {
                     "status": "active",
@@ -216,25 +283,11 @@ class NewsPipeline:
                     "item_count": new_items_count,
                 },
             },
+            defer,
         )
 
         logger.debug(f"Updated source '{source_doc['name']}' status to active")
 
-    async def _get_user_tag_rules(self, user_id: str) -> List[Dict[str, Any]]:
-        """
-        Get cached tag rules for a user.
-
-        Args:
-            user_id: User ID
-
-        Returns:
-            List of active tag rule documents
-        """
-        cursor = self.db.tag_rules.find({"user_id": user_id, "is_active": True}).sort(
-            "priority", -1
-        )
-        return await cursor.to_list(length=100)
-
     async def _apply_auto_tags(
         self,
         user_id: str,
@@ -247,48 +300,45 @@ class NewsPipeline:
             user_id: User ID
             items: List of news item documents to tag
         """
-        # Get user's tag rules
-        rules = await self._get_user_tag_rules(user_id)
-
-        if not rules:
+        matcher = await TagService(self.db).get_matcher(user_id)
+        if matcher is None:
             return
 
-        # Create matcher
-        matcher = RuleMatcher(rules)
-
-        # Apply tags to each item
-        for item in items:
-            matched_tags, _ = matcher.match(
-                title=item.get("title", ""),
-                description=item.get("description", ""),
-                content=item.get("content", ""),
-            )
+        # Apply tags to all items in one rule-major pass
+        matches = matcher.match_many(
+            [
+                (item.get("title", ""), item.get("description", ""), item.get("content", ""))
+                for item in items
+            ]
+        )
+        for item, (matched_tags, _) in zip(items, matches):
             if matched_tags:
                 item["tags"] = matched_tags
 
+    async def flush_index(self) -> None:
+        """Index every deferred document, embedding them in one batch."""
+        pending, self._pending_index = self._pending_index, {}
+        if pending:
+            await self._index_to_elasticsearch(pending)
+
     async def _index_to_elasticsearch(
         self,
-        user_id: str,
-        docs: List[Dict[str, Any]],
+        docs_by_user: Dict[str, List[Dict[str, Any]]],
     ) -> None:
         """
         Index news items to Elasticsearch for search.
 
         Args:
-            user_id: User ID
-            docs: List of news documents with _id
+            docs_by_user: News documents with _id, grouped by user ID
         """
         try:
-            from app.db.es import es_client
-            from app.services.search.indexer import ESIndexer
-
             # Check if ES is available
             if not es_client.is_connected:
                 logger.debug("Elasticsearch not available, skipping indexing")
                 return
 
             indexer = ESIndexer(es_client.client)
-            indexed = await indexer.index_batch(user_id, docs, generate_embeddings=True)
+            indexed = await indexer.index_many(docs_by_user, generate_embeddings=True)
             logger.debug(f"Indexed {indexed} items to Elasticsearch")
         except Exception as e:
             # Non-critical, just log the error
@@ -298,6 +348,7 @@ class NewsPipeline:
         self,
         source_doc: Dict[str, Any],
         error_message: Optional[str],
+        defer: bool = False,
     ) -> None:
         """
         Update source document after failed collection.
@@ -305,12 +356,13 @@ class NewsPipeline:
         Args:
             source_doc: Source document
             error_message: Error description
+            defer: Queue the write for ``flush_source_updates``
         """
         source_id = source_doc["_id"]
         now = datetime.utcnow()
 
-        await self.db.sources.update_one(
-            {"_id": source_id},
+        await self._write_source_update(
+            source_id,
             {
                 "$set": {
                     "status": "error",
@@ -322,12 +374,42 @@ class NewsPipeline:
                     "fetch_count": 1,
                 },
             },
+            defer,
         )
 
         logger.warning(
             f"Source '{source_doc['name']}' marked as error: {error_message}"
         )
 
+    async def _write_source_update(
+        self,
+        source_id: Any,
+        update: Dict[str, Any],
+        defer: bool,
+    ) -> None:
+        """
+        Apply or queue a status update on a source document.
+
+        Args:
+            source_id: Source ``_id``
+            update: Update document
+            defer: Queue the write instead of issuing it now
+        """
+        if defer:
+            self._pending_source_updates.append(UpdateOne({"_id": source_id}, update))
+        else:
+            await self.db.sources.update_one({"_id": source_id}, update)
+
+    async def flush_source_updates(self) -> None:
+        """Write every queued source status update in one bulk_write."""
+        pending, self._pending_source_updates = self._pending_source_updates, []
+        if not pending:
+            return
+        try:
+            await self.db.sources.bulk_write(pending, ordered=False)
+        except Exception as e:
+            logger.error(f"Error updating source statuses: {e}")
+
 
 class CollectionService:
     """
@@ -336,6 +418,20 @@ class CollectionService:
     Combines collector and pipeline for end-to-end collection.
     """
 
+    # Due-source batch size per scheduler tick
+    DUE_BATCH = 50
+
+    # Earliest time any source becomes due; ticks before it skip the scan.
+    # None means unknown (rescan), reset via ``invalidate_schedule``.
+    _next_due_at: Optional[datetime] = None
+
+    # Upper bound on how far past a tick's start ``_next_due_at`` may be
+    # set. Kept below the scheduler interval (COLLECTION_INTERVAL_SECONDS,
+    # 300 s) so the following tick always rescans: sources added without
+    # ``invalidate_schedule`` (demo seeding, agent tools, other workers)
+    # are picked up by the next tick.
+    MAX_SKIP_SECONDS = 240
+
     def __init__(self, db: AsyncIOMotorDatabase):
         """
         Initialize collection service.
@@ -346,18 +442,25 @@ class CollectionService:
         self.db = db
         self.pipeline = NewsPipeline(db)
 
-    async def collect_source(self, source_id: str) -> Dict[str, Any]:
+    async def collect_source(
+        self,
+        source_id: str,
+        defer_indexing: bool = False,
+        defer_source_updates: bool = False,
+    ) -> Dict[str, Any]:
         """
         Run collection for a single source.
 
         Args:
             source_id: Source ID to collect
+            defer_indexing: Leave stored items queued on the pipeline for a
+                later ``flush_index``
+            defer_source_updates: Leave the source status update queued on
+                the pipeline for a later ``flush_source_updates``
 
         Returns:
             Result summary dict
         """
-        from app.services.collector import CollectorFactory
-
         # Get source document
         try:
             oid = ObjectId(source_id)
@@ -374,7 +477,12 @@ class CollectionService:
         result = await CollectorFactory.collect(source_doc)
 
         # Process results
-        stored, duplicates = await self.pipeline.process(source_doc, result)
+        stored, duplicates = await self.pipeline.process(
+            source_doc,
+            result,
+            defer_indexing=defer_indexing,
+            defer_source_updates=defer_source_updates,
+        )
 
         return {
             "success": result.success,
@@ -406,29 +514,52 @@ class CollectionService:
         )
         sources = await cursor.to_list(length=100)
 
-        results = []
-        for source in sources:
-            result = await self.collect_source(str(source["_id"]))
-            results.append(result)
-
-        return results
+        return await self._collect_many(sources)
 
     async def collect_due_sources(self) -> List[Dict[str, Any]]:
         """
         Collect all sources that are due for refresh.
 
-        This is intended to be called by the scheduler.
+        This is intended to be called by the scheduler. After a partial
+        batch the earliest upcoming due time is remembered, and ticks before
+        it return without querying MongoDB.
 
         Returns:
             List of result summaries
         """
         now = datetime.utcnow()
+        next_due_at = CollectionService._next_due_at
+        if next_due_at is not None and now < next_due_at:
+            return []
+        CollectionService._next_due_at = None
 
         # Find sources where:
         # - status is active or pending
         # - last_fetched_at + refresh_interval < now
         # OR last_fetched_at is None
-        pipeline = [
+        pipeline = self._schedule_stages() + [
+            {"$match": {"next_fetch_at": {"$lte": now}}},
+            {"$limit": self.DUE_BATCH},  # Process in batches
+        ]
+
+        cursor = self.db.sources.aggregate(pipeline)
+        sources = await cursor.to_list(length=self.DUE_BATCH)
+
+        results = await self._collect_many(sources)
+
+        if results:
+            logger.info(f"Collected {len(results)} due sources")
+
+        # A full batch may leave more sources due; rescan on the next tick
+        if len(sources) < self.DUE_BATCH:
+            await self._update_next_due_at(now)
+
+        return results
+
+    @staticmethod
+    def _schedule_stages() -> List[Dict[str, Any]]:
+        """Aggregation stages selecting collectable sources with ``next_fetch_at``."""
+        return [
             {
                 "$match": {
                     "status": {"$in": ["active", "pending"]},
@@ -448,19 +579,77 @@ class CollectionService:
                     },
                 }
             },
-            {"$match": {"next_fetch_at": {"$lte": now}}},
-            {"$limit": 50},  # Process in batches
         ]
 
-        cursor = self.db.sources.aggregate(pipeline)
-        sources = await cursor.to_list(length=50)
+    async def _update_next_due_at(self, tick_started: datetime) -> None:
+        """Remember when the next source becomes due, capped per tick.
 
-        results = []
-        for source in sources:
-            result = await self.collect_source(str(source["_id"]))
-            results.append(result)
+        Args:
+            tick_started: Start time of the tick that scanned the sources
+        """
+        try:
+            cursor = self.db.sources.aggregate(
+                self._schedule_stages()
+                + [{"$group": {"_id": None, "next": {"$min": "$next_fetch_at"}}}]
+            )
+            docs = await cursor.to_list(length=1)
+        except Exception as e:
+            logger.warning(f"Failed to compute next due time: {e}")
+            return
+        cap = tick_started + timedelta(seconds=self.MAX_SKIP_SECONDS)
+        next_due = docs[0]["next"] if docs and docs[0]["next"] else None
+        CollectionService._next_due_at = min(next_due, cap) if next_due else cap
 
-        if results:
-            logger.info(f"Collected {len(results)} due sources")
+    @classmethod
+    def invalidate_schedule(cls) -> None:
+        """Force the next scheduler tick to rescan sources.
+
+        Call after creating a source or changing its status or refresh
+        interval.
+        """
+        cls._next_due_at = None
+
+    async def _collect_many(
+        self, sources: List[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """
+        Collect several sources concurrently, bounded by a semaphore.
 
+        Stored items are indexed once all sources finish, so embeddings for
+        the whole tick are generated in a single batch, and source status
+        updates are written with a single bulk_write.
+
+        Args:
+            sources: Source documents to collect
+
+        Returns:
+            List of result summaries, in the same order as ``sources``
+        """
+        semaphore = asyncio.Semaphore(max(1, settings.collector_max_concurrency))
+
+        async def run(source_id: str) -> Dict[str, Any]:
+            async with semaphore:
+                return await self.collect_source(
+                    source_id, defer_indexing=True, defer_source_updates=True
+                )
+
+        source_ids = [str(source["_id"]) for source in sources]
+        try:
+            outcomes = await asyncio.gather(
+                *(run(source_id) for source_id in source_ids), return_exceptions=True
+            )
+        finally:
+            await self.pipeline.flush_source_updates()
+            await self.pipeline.flush_index()
+
+        results = []
+        for source_id, outcome in zip(source_ids, outcomes):
+            if isinstance(outcome, BaseException):
+                logger.error(f"Collection failed for source {source_id}: {outcome}")
+                outcome = {
+                    "success": False,
+                    "source_id": source_id,
+                    "error": str(outcome),
+                }
+            results.append(outcome)
         return results
@@ -1,9 +1,12 @@
 """
 Task Scheduler Service
 
-Manages periodic background tasks using APScheduler.
+Manages periodic background tasks. The collection loop runs as a plain
+asyncio task; APScheduler remains available for cron-style jobs.
 """
 
+import asyncio
+import time
 from datetime import datetime
 from typing import Any, Callable, Dict, Optional
 
@@ -12,6 +15,9 @@ from apscheduler.triggers.interval import IntervalTrigger
 from apscheduler.triggers.cron import CronTrigger
 from loguru import logger
 
+from app.db.mongo import mongodb
+from app.services.pipeline import CollectionService
+
 
 class TaskScheduler:
     """
@@ -136,6 +142,33 @@ class TaskScheduler:
 # Global scheduler instance
 scheduler = TaskScheduler()
 
+# Collection interval and the asyncio task driving it
+COLLECTION_INTERVAL_SECONDS = 300
+_collection_loop: Optional[asyncio.Task] = None
+
+
+async def _run_periodic(func: Callable, seconds: float) -> None:
+    """
+    Await ``func`` every ``seconds`` on the event loop.
+
+    The first run happens one interval after start, like an APScheduler
+    interval job. Runs never overlap; a slow run shortens the following
+    sleep instead of queueing another call.
+
+    Args:
+        func: Async function to call
+        seconds: Interval between run starts
+    """
+    delay = seconds
+    while True:
+        await asyncio.sleep(delay)
+        started = time.monotonic()
+        try:
+            await func()
+        except Exception as e:
+            logger.error(f"Periodic task '{func.__name__}' failed: {e}")
+        delay = max(0.0, seconds - (time.monotonic() - started))
+
 
 async def collection_task() -> None:
     """
@@ -143,9 +176,6 @@ async def collection_task() -> None:
 
     Called periodically by the scheduler.
     """
-    from app.db.mongo import mongodb
-    from app.services.pipeline import CollectionService
-
     if mongodb.client is None:
         logger.warning("MongoDB not connected, skipping collection task")
         return
@@ -168,18 +198,24 @@ def setup_scheduler() -> None:
     """
     Initialize and configure the scheduler with default jobs.
 
-    Call this during application startup.
+    Call this during application startup, from within the running loop.
     """
-    # Add periodic collection job (every 5 minutes)
-    scheduler.add_interval_job(
-        func=collection_task,
-        job_id="collect_due_sources",
-        minutes=5,
-    )
-
-    # Start the scheduler
+    global _collection_loop
+
+    # APScheduler keeps serving jobs added through add_interval_job and
+    # add_cron_job; collection itself runs on its own asyncio task
     scheduler.start()
 
+    # Periodic collection (every 5 minutes) as a native asyncio task
+    if _collection_loop is None or _collection_loop.done():
+        _collection_loop = asyncio.create_task(
+            _run_periodic(collection_task, COLLECTION_INTERVAL_SECONDS),
+            name="collect_due_sources",
+        )
+        logger.info(
+            f"Collection loop started (every {COLLECTION_INTERVAL_SECONDS}s)"
+        )
+
 
 def shutdown_scheduler() -> None:
     """
@@ -187,4 +223,11 @@ def shutdown_scheduler() -> None:
 
     Call this during application shutdown.
     """
+    global _collection_loop
+
+    if _collection_loop is not None:
+        _collection_loop.cancel()
+        _collection_loop = None
+        logger.info("Collection loop stopped")
+
     scheduler.shutdown(wait=True)
@@ -5,13 +5,19 @@ Generates text embeddings using Sentence-Transformers for semantic search.
 Uses lazy loading to avoid loading the model until needed.
 """
 
-from typing import List, Optional
+from collections import OrderedDict, namedtuple
+from hashlib import blake2b
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+import asyncio
 import threading
 
 from loguru import logger
 
 from app.core.config import settings
 
+CacheInfo = namedtuple("CacheInfo", ["hits", "misses", "maxsize", "currsize"])
+
 
 class EmbeddingService:
     """
@@ -26,6 +32,12 @@ class EmbeddingService:
     _model = None
     _model_loaded = False
 
+    # LRU of single-text embeddings keyed by a 16-byte digest of the text
+    _cache: "OrderedDict[bytes, List[float]]" = OrderedDict()
+    _cache_lock = threading.Lock()
+    _cache_hits = 0
+    _cache_misses = 0
+
     def __new__(cls) -> "EmbeddingService":
         """Ensure singleton pattern."""
         if cls._instance is None:
@@ -47,7 +59,9 @@ class EmbeddingService:
                 from sentence_transformers import SentenceTransformer
 
                 logger.info(f"Loading embedding model: {settings.embedding_model_name}")
-                self._model = SentenceTransformer(settings.embedding_model_name)
+                self._model = self._load_model(SentenceTransformer)
+                # Vectors from another model must not be served from cache
+                self.cache_clear()
                 self._model_loaded = True
                 logger.info(
                     f"Embedding model loaded (dim={settings.embedding_dimension})"
@@ -65,6 +79,51 @@ class EmbeddingService:
                 self._model = None
                 self._model_loaded = True
 
+    @staticmethod
+    def _load_model(sentence_transformer: Any) -> Any:
+        """
+        Build the SentenceTransformer for the configured backend.
+
+        ONNX backends need ``optimum[onnxruntime]``; if it is missing or the
+        export fails, the PyTorch model is used instead.
+
+        Args:
+            sentence_transformer: The SentenceTransformer class
+
+        Returns:
+            Loaded model
+        """
+        name = settings.embedding_model_name
+        backend = settings.embedding_backend.lower()
+        if backend not in ("onnx", "onnx-int8"):
+            return sentence_transformer(name)
+
+        try:
+            if backend == "onnx":
+                return sentence_transformer(name, backend="onnx")
+
+            # Dynamic INT8 quantization, exported once and reused from disk
+            from sentence_transformers import export_dynamic_quantized_onnx_model
+
+            save_dir = Path(settings.embedding_onnx_dir) / name.replace("/", "__")
+            file_name = "onnx/model_qint8_avx512_vnni.onnx"
+            if not (save_dir / file_name).exists():
+                logger.info(f"Exporting INT8 ONNX embedding model to {save_dir}")
+                model = sentence_transformer(name, backend="onnx")
+                model.save(str(save_dir))
+                export_dynamic_quantized_onnx_model(model, "avx512_vnni", str(save_dir))
+            return sentence_transformer(
+                str(save_dir), backend="onnx", model_kwargs={"file_name": file_name}
+            )
+        except ImportError:
+            logger.warning(
+                "optimum[onnxruntime] not installed, using PyTorch embedding backend. "
+                "Install with: pip install optimum[onnxruntime]"
+            )
+        except Exception as e:
+            logger.warning(f"ONNX embedding backend failed, using PyTorch: {e}")
+        return sentence_transformer(name)
+
     @property
     def is_available(self) -> bool:
         """Check if embedding model is available."""
@@ -88,68 +147,218 @@ class EmbeddingService:
         if self._model is None:
             return None
 
+        # Truncate very long text to avoid memory issues
+        text = text[:2000]
+        key = self._cache_key(text)
+        cached = self._cache_get(key)
+        if cached is not None:
+            return cached
+
         try:
-            # Truncate very long text to avoid memory issues
-            text = text[:2000]
-            embedding = self._model.encode(text, convert_to_numpy=True)
-            return embedding.tolist()
+            embedding = self._model.encode(text, convert_to_numpy=True).tolist()
         except Exception as e:
             logger.error(f"Error generating embedding: {e}")
             return None
 
-    def encode_batch(self, texts: List[str]) -> List[Optional[List[float]]]:
+        self._cache_put(key, embedding)
+        return embedding
+
+    @staticmethod
+    def _cache_key(text: str) -> bytes:
+        """Cache key of an already truncated text."""
+        return blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+    def _cache_get(self, key: bytes) -> Optional[List[float]]:
+        """Look up a cached embedding, counting the hit or miss."""
+        with self._cache_lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                EmbeddingService._cache_hits += 1
+                return cached
+            EmbeddingService._cache_misses += 1
+            return None
+
+    def _cache_put(self, key: bytes, embedding: List[float]) -> None:
+        """Store an embedding, evicting the least recently used entries."""
+        maxsize = settings.embedding_cache_size
+        if maxsize <= 0:
+            return
+        with self._cache_lock:
+            self._cache[key] = embedding
+            self._cache.move_to_end(key)
+            while len(self._cache) > maxsize:
+                self._cache.popitem(last=False)
+
+    def cache_info(self) -> CacheInfo:
+        """Return hit/miss statistics of the single-text embedding cache."""
+        with self._cache_lock:
+            return CacheInfo(
+                self._cache_hits,
+                self._cache_misses,
+                settings.embedding_cache_size,
+                len(self._cache),
+            )
+
+    def cache_clear(self) -> None:
+        """Drop all cached embeddings and reset the statistics."""
+        with self._cache_lock:
+            self._cache.clear()
+            EmbeddingService._cache_hits = 0
+            EmbeddingService._cache_misses = 0
+
+    def encode_batch_np(self, texts: List[str]) -> Tuple[Optional[Any], List[bool]]:
         """
-        Generate embeddings for multiple texts.
+        Generate embeddings for multiple texts as one NumPy array.
+
+        Avoids building N x dim Python floats; rows can be handed to the
+        Elasticsearch serializer as-is.
 
         Args:
             texts: List of input texts
 
         Returns:
-            List of embedding vectors (or None for failed items)
+            Tuple of a float32 ``(N, dim)`` array (zero rows for empty texts),
+            or None if unavailable, and a per-text valid mask
         """
-        if not texts:
-            return []
+        valid_mask = [bool(text and text.strip()) for text in texts]
+        if not any(valid_mask):
+            return None, valid_mask
 
         self._ensure_model_loaded()
         if self._model is None:
-            return [None] * len(texts)
+            return None, [False] * len(texts)
+
+        try:
+            import numpy as np
+
+            # Truncate and skip empty texts
+            positions = [i for i, valid in enumerate(valid_mask) if valid]
+            processed = [texts[i][:2000] for i in positions]
+
+            # Shortest first, so each forward pass pads to a similar length
+            order = sorted(range(len(processed)), key=lambda j: len(processed[j]))
+            result = None
+            for batch in self._micro_batches(processed, order):
+                rows, embeddings = self._encode_micro_batch(
+                    [processed[j] for j in batch]
+                )
+                for j, ok in zip(batch, rows):
+                    if not ok:
+                        valid_mask[positions[j]] = False
+                if embeddings is None:
+                    continue
+                if result is None:
+                    result = np.zeros(
+                        (len(texts), embeddings.shape[1]), dtype=np.float32
+                    )
+                result[[positions[j] for j, ok in zip(batch, rows) if ok]] = embeddings
+
+            if result is None:
+                return None, [False] * len(texts)
+            return result, valid_mask
+        except Exception as e:
+            logger.error(f"Error generating batch embeddings: {e}")
+            return None, [False] * len(texts)
+
+    @staticmethod
+    def _micro_batches(texts: List[str], order: List[int]) -> List[List[int]]:
+        """
+        Split length-sorted text indices into micro-batches.
+
+        A batch closes once it holds ``embedding_micro_batch_size`` texts or
+        adding the next text would exceed ``embedding_batch_char_budget``.
+
+        Args:
+            texts: Input texts
+            order: Indices into ``texts``, sorted by length
+
+        Returns:
+            Lists of indices, one per forward pass
+        """
+        max_size = max(1, settings.embedding_micro_batch_size)
+        char_budget = settings.embedding_batch_char_budget
+        batches: List[List[int]] = []
+        batch: List[int] = []
+        chars = 0
+        for j in order:
+            length = len(texts[j])
+            if batch and (len(batch) >= max_size or chars + length > char_budget):
+                batches.append(batch)
+                batch, chars = [], 0
+            batch.append(j)
+            chars += length
+        if batch:
+            batches.append(batch)
+        return batches
+
+    def _encode_micro_batch(self, texts: List[str]) -> Tuple[List[bool], Optional[Any]]:
+        """
+        Encode one micro-batch, retrying text by text if the batch fails.
+
+        Args:
+            texts: Non-empty input texts
+
+        Returns:
+            Tuple of a per-text success mask and a float32 array holding the
+            rows of the successful texts (None if all failed)
+        """
+        import numpy as np
 
         try:
-            # Truncate and filter empty texts
-            processed = []
-            indices = []
-            for i, text in enumerate(texts):
-                if text and text.strip():
-                    processed.append(text[:2000])
-                    indices.append(i)
-
-            if not processed:
-                return [None] * len(texts)
-
-            # Batch encode
             embeddings = self._model.encode(
-                processed,
+                texts,
                 convert_to_numpy=True,
                 show_progress_bar=False,
-                batch_size=32,
+                batch_size=len(texts),
+            )
+            return [True] * len(texts), embeddings.astype(np.float32, copy=False)
+        except Exception as e:
+            if len(texts) == 1:
+                logger.error(f"Error generating embedding: {e}")
+                return [False], None
+            # e.g. out of memory on long inputs; smaller passes may still fit
+            logger.warning(
+                f"Batch embedding of {len(texts)} texts failed ({e}), "
+                "retrying one by one"
             )
 
-            # Map back to original positions
-            result: List[Optional[List[float]]] = [None] * len(texts)
-            for i, idx in enumerate(indices):
-                result[idx] = embeddings[i].tolist()
+        rows: List[bool] = []
+        embeddings = []
+        for text in texts:
+            ok, embedding = self._encode_micro_batch([text])
+            rows.extend(ok)
+            if embedding is not None:
+                embeddings.append(embedding)
+        if not embeddings:
+            return rows, None
+        return rows, np.concatenate(embeddings)
 
-            return result
-        except Exception as e:
-            logger.error(f"Error generating batch embeddings: {e}")
+    def encode_batch(self, texts: List[str]) -> List[Optional[List[float]]]:
+        """
+        Generate embeddings for multiple texts.
+
+        Args:
+            texts: List of input texts
+
+        Returns:
+            List of embedding vectors (or None for failed items)
+        """
+        embeddings, valid_mask = self.encode_batch_np(texts)
+        if embeddings is None:
             return [None] * len(texts)
+        return [
+            embeddings[i].tolist() if valid else None
+            for i, valid in enumerate(valid_mask)
+        ]
 
     def encode_for_search(self, query: str) -> Optional[List[float]]:
         """
         Generate embedding optimized for search queries.
 
         For most models, this is the same as encode().
-        Some models may have query-specific encoders.
+        Some models may have query-specific encoders. Repeated queries are
+        answered from the LRU cache shared with ``encode``.
 
         Args:
             query: Search query text
@@ -159,6 +368,102 @@ class EmbeddingService:
         """
         return self.encode(query)
 
+    async def encode_for_search_async(self, query: str) -> Optional[List[float]]:
+        """
+        Embed a search query without blocking the event loop.
+
+        Cache misses from concurrent requests are encoded together in one
+        batched forward pass by ``EmbeddingBatcher``.
+
+        Args:
+            query: Search query text
+
+        Returns:
+            Embedding vector or None
+        """
+        return await query_batcher.encode(query)
+
+
+class EmbeddingBatcher:
+    """
+    Dynamic batching of single-text embedding requests.
+
+    Requests arriving within ``embedding_batch_window_ms`` of each other,
+    up to ``embedding_batch_max`` texts, share one ``encode_batch_np`` call,
+    run in a worker thread.
+    """
+
+    def __init__(self, service: EmbeddingService):
+        self._service = service
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+
+    async def encode(self, text: str) -> Optional[List[float]]:
+        """
+        Embed one text, batching it with concurrent requests.
+
+        Args:
+            text: Input text to embed
+
+        Returns:
+            Embedding vector or None if unavailable
+        """
+        if not text or not text.strip():
+            return None
+        text = text[:2000]
+        cached = self._service._cache_get(self._service._cache_key(text))
+        if cached is not None:
+            return cached
+
+        if self._worker is None or self._worker.done():
+            # Keep queued requests for the restarted worker
+            if self._queue is None:
+                self._queue = asyncio.Queue()
+            self._worker = asyncio.create_task(self._run(), name="embedding-batcher")
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((text, future))
+        return await future
+
+    async def _run(self) -> None:
+        """Collect requests for one window, then encode them together."""
+        loop = asyncio.get_running_loop()
+        queue = self._queue
+        while True:
+            batch = [await queue.get()]
+            deadline = loop.time() + settings.embedding_batch_window_ms / 1000
+            while len(batch) < settings.embedding_batch_max:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            await self._encode(batch)
+
+    async def _encode(self, batch: List[Tuple[str, asyncio.Future]]) -> None:
+        """Encode the distinct texts of a batch and resolve every request."""
+        texts = list(dict.fromkeys(text for text, _ in batch))
+        results: Dict[str, Optional[List[float]]] = {}
+        try:
+            array, valid_mask = await asyncio.to_thread(
+                self._service.encode_batch_np, texts
+            )
+            if array is not None:
+                for i, text in enumerate(texts):
+                    if valid_mask[i]:
+                        embedding = array[i].tolist()
+                        results[text] = embedding
+                        self._service._cache_put(
+                            self._service._cache_key(text), embedding
+                        )
+        except Exception as e:
+            logger.error(f"Error generating batched query embeddings: {e}")
+        for text, future in batch:
+            if not future.done():
+                future.set_result(results.get(text))
+
 
 # Global instance
 embedding_service = EmbeddingService()
+query_batcher = EmbeddingBatcher(embedding_service)
@@ -4,16 +4,174 @@ Elasticsearch Indexer Service
 Handles indexing news items to Elasticsearch for search functionality.
 """
 
+import asyncio
+from contextlib import nullcontext
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
 from elasticsearch import AsyncElasticsearch
+from elasticsearch.helpers import async_streaming_bulk
 from loguru import logger
 
+from app.core.config import settings
 from app.db.es import es_client
 from app.services.search.embedding import embedding_service
 
 
+class BulkBuffer:
+    """
+    Coalesces single-document index requests into bulk requests.
+
+    Callers put one action on a bounded queue and either await its result
+    or return right away (fire-and-forget). When the queue is full, ``put``
+    blocks, pushing back on producers instead of overloading Elasticsearch.
+    Worker tasks collect actions for up to ``es_buffer_window_ms`` or
+    ``es_buffer_batch_size`` docs, whichever comes first, and send them
+    through the streaming bulk helper.
+    """
+
+    def __init__(self):
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+        self.indexed = 0
+        self.failed = 0
+
+    def start(self) -> None:
+        """Start the worker tasks. Call from within the running loop."""
+        if self._workers and not all(w.done() for w in self._workers):
+            return
+        # Restarted workers drain the existing queue, so submitters already
+        # waiting on queued actions still get their results
+        if self._queue is None:
+            self._queue = asyncio.Queue(
+                maxsize=max(1, settings.es_buffer_queue_size)
+            )
+        self._workers = [
+            asyncio.create_task(self._run(), name=f"es-bulk-buffer-{n}")
+            for n in range(max(1, settings.es_buffer_workers))
+        ]
+
+    @property
+    def depth(self) -> int:
+        """Number of actions waiting in the queue."""
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def stats(self) -> Dict[str, int]:
+        """Queue depth and counters of indexed/failed documents."""
+        return {"queued": self.depth, "indexed": self.indexed, "failed": self.failed}
+
+    async def submit(
+        self, es: AsyncElasticsearch, action: Dict[str, Any], wait: bool = True
+    ) -> bool:
+        """
+        Queue an index action, optionally waiting for it to be written.
+
+        Args:
+            es: Elasticsearch async client
+            action: Bulk action with ``_index``, ``_id`` and ``_source``
+            wait: Await the bulk result; if False, return once queued
+
+        Returns:
+            True if the document was indexed (or queued, when not waiting)
+        """
+        self.start()
+        future = asyncio.get_running_loop().create_future() if wait else None
+        await self._queue.put((es, action, future))
+        return await future if future is not None else True
+
+    async def _run(self) -> None:
+        """Drain the queue in size- or time-bounded batches forever."""
+        loop = asyncio.get_running_loop()
+        queue = self._queue
+        while True:
+            batch = [await queue.get()]
+            deadline = loop.time() + settings.es_buffer_window_ms / 1000
+            while len(batch) < settings.es_buffer_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            try:
+                await self._flush(batch)
+            except Exception as e:
+                logger.error(f"Bulk buffer flush failed: {e}")
+                for _, _, future in batch:
+                    if future is not None and not future.done():
+                        self._resolve(future, False)
+            finally:
+                for _ in batch:
+                    queue.task_done()
+
+    async def _flush(
+        self,
+        batch: List[Tuple[AsyncElasticsearch, Dict[str, Any], Optional[asyncio.Future]]],
+    ) -> None:
+        """Send one batch and report each action's outcome."""
+        by_client: Dict[int, List[Tuple[Any, ...]]] = {}
+        for entry in batch:
+            by_client.setdefault(id(entry[0]), []).append(entry)
+
+        for entries in by_client.values():
+            # Retried actions come back out of order, so match on _id
+            pending: Dict[str, List[Optional[asyncio.Future]]] = {}
+            for _, action, future in entries:
+                pending.setdefault(action["_id"], []).append(future)
+            try:
+                async for ok, info in async_streaming_bulk(
+                    entries[0][0].options(request_timeout=settings.es_bulk_timeout),
+                    (action for _, action, _ in entries),
+                    chunk_size=settings.es_bulk_chunk_size,
+                    max_chunk_bytes=settings.es_bulk_max_bytes,
+                    raise_on_error=False,
+                    max_retries=3,
+                    initial_backoff=0.5,
+                ):
+                    result = next(iter(info.values()))
+                    futures = pending.get(result.get("_id"))
+                    if futures:
+                        self._resolve(futures.pop(0), ok)
+            except Exception as e:
+                logger.error(f"Error bulk indexing buffered items: {e}")
+            # Anything left unanswered failed
+            for futures in pending.values():
+                for future in futures:
+                    self._resolve(future, False)
+
+    def _resolve(self, future: Optional[asyncio.Future], ok: bool) -> None:
+        """Count an outcome and hand it to a waiting submitter, if any."""
+        if ok:
+            self.indexed += 1
+        else:
+            self.failed += 1
+        if future is not None and not future.done():
+            future.set_result(ok)
+
+    async def aclose(self, timeout: float = 10.0) -> None:
+        """
+        Flush queued actions, then stop the workers.
+
+        Call on application shutdown, before the ES client is closed.
+
+        Args:
+            timeout: Seconds to wait for the queue to drain
+        """
+        if self._queue is not None and self._workers:
+            try:
+                await asyncio.wait_for(self._queue.join(), timeout)
+            except asyncio.TimeoutError:
+                logger.warning(f"Dropping {self.depth} unindexed ES actions on shutdown")
+        for worker in self._workers:
+            worker.cancel()
+        self._workers = []
+
+
+# Shared buffer for single-document indexing
+bulk_buffer = BulkBuffer()
+
+
 class ESIndexer:
     """
     Indexes news items to Elasticsearch.
@@ -44,6 +202,7 @@ class ESIndexer:
         news_id: str,
         doc: Dict[str, Any],
         generate_embedding: bool = True,
+        wait: bool = True,
     ) -> bool:
         """
         Index a single news item.
@@ -53,9 +212,10 @@ class ESIndexer:
             news_id: News item ID
             doc: News document from MongoDB
             generate_embedding: Whether to generate embedding
+            wait: Await the write; if False, return once it is queued
 
         Returns:
-            True if successful
+            True if successful (or queued, when not waiting)
         """
         try:
             # Ensure index exists
@@ -66,20 +226,28 @@ class ESIndexer:
             es_doc = self._prepare_document(doc)
 
             # Generate embedding if enabled
-            if generate_embedding and embedding_service.is_available:
+            if generate_embedding and await self._embeddings_available():
                 text_for_embedding = self._get_text_for_embedding(doc)
-                embedding = embedding_service.encode(text_for_embedding)
+                embedding = await asyncio.to_thread(
+                    embedding_service.encode, text_for_embedding
+                )
                 if embedding:
                     es_doc["embedding"] = embedding
 
-            # Index document
-            await self.es.index(
-                index=index_name,
-                id=news_id,
-                document=es_doc,
+            # Index document, coalesced with concurrent single-doc requests
+            indexed = await bulk_buffer.submit(
+                self.es,
+                {
+                    "_op_type": "index",
+                    "_index": index_name,
+                    "_id": news_id,
+                    "_source": es_doc,
+                },
+                wait=wait,
             )
-
-            return True
+            if not indexed:
+                logger.error(f"Error indexing news item {news_id}")
+            return indexed
         except Exception as e:
             logger.error(f"Error indexing news item {news_id}: {e}")
             return False
@@ -89,6 +257,7 @@ class ESIndexer:
         user_id: str,
         items: List[Dict[str, Any]],
         generate_embeddings: bool = True,
+        precomputed_embeddings: Optional[Sequence[Optional[Any]]] = None,
     ) -> int:
         """
         Index multiple news items in batch.
@@ -97,6 +266,8 @@ class ESIndexer:
             user_id: User ID
             items: List of (news_id, doc) tuples
             generate_embeddings: Whether to generate embeddings
+            precomputed_embeddings: Embeddings (lists or NumPy rows) aligned
+                with ``items``; when given, no embeddings are generated here
 
         Returns:
             Number of successfully indexed items
@@ -120,28 +291,45 @@ class ESIndexer:
                 docs.append(es_doc)
                 texts_for_embedding.append(self._get_text_for_embedding(item))
 
-            # Generate embeddings in batch
-            if generate_embeddings and embedding_service.is_available:
-                embeddings = embedding_service.encode_batch(texts_for_embedding)
-                for i, embedding in enumerate(embeddings):
-                    if embedding:
+            if precomputed_embeddings is not None:
+                # NumPy rows are serialized by the ES client directly
+                for i, embedding in enumerate(precomputed_embeddings):
+                    if embedding is not None:
                         docs[i]["embedding"] = embedding
+            embed = (
+                precomputed_embeddings is None
+                and generate_embeddings
+                and await self._embeddings_available()
+            )
 
-            # Build bulk request
-            operations = []
-            for doc in docs:
-                doc_id = doc.pop("_id")
-                operations.append({"index": {"_index": index_name, "_id": doc_id}})
-                operations.append(doc)
-
-            # Execute bulk request
-            response = await self.es.bulk(operations=operations)
-
-            # Count successes
-            success_count = 0
-            for item in response.get("items", []):
-                if item.get("index", {}).get("status") in [200, 201]:
-                    success_count += 1
+            # Shards are embedded one after another in a worker thread while
+            # earlier shards are already being bulk-indexed; large batches
+            # skip per-interval refreshes until done
+            shard_size = settings.es_bulk_chunk_size
+            if embed:
+                shards = max(1, settings.embedding_pipeline_shards)
+                shard_size = min(shard_size, -(-len(docs) // shards))
+            embed_lock = asyncio.Lock()
+            semaphore = asyncio.Semaphore(max(1, settings.es_bulk_concurrency))
+            bulk_load = (
+                es_client.bulk_load(index_name)
+                if len(docs) >= settings.es_bulk_load_threshold
+                else nullcontext()
+            )
+            async with bulk_load:
+                counts = await asyncio.gather(
+                    *(
+                        self._index_shard(
+                            index_name,
+                            docs[i:i + shard_size],
+                            texts_for_embedding[i:i + shard_size] if embed else None,
+                            embed_lock,
+                            semaphore,
+                        )
+                        for i in range(0, len(docs), shard_size)
+                    )
+                )
+            success_count = sum(counts)
 
             logger.info(f"Indexed {success_count}/{len(items)} items to ES")
             return success_count
@@ -150,6 +338,125 @@ class ESIndexer:
             logger.error(f"Error batch indexing: {e}")
             return 0
 
+    async def _index_shard(
+        self,
+        index_name: str,
+        docs: List[Dict[str, Any]],
+        texts: Optional[List[str]],
+        embed_lock: asyncio.Lock,
+        semaphore: asyncio.Semaphore,
+    ) -> int:
+        """
+        Embed one shard of documents, then bulk-index it.
+
+        Args:
+            index_name: Target index
+            docs: Prepared ES documents carrying their ``_id``
+            texts: Texts to embed, aligned with ``docs``; None to skip
+            embed_lock: Serializes model calls across shards
+            semaphore: Bounds concurrent bulk requests
+
+        Returns:
+            Number of successfully indexed documents
+        """
+        if texts is not None:
+            async with embed_lock:
+                array, valid_mask = await asyncio.to_thread(
+                    embedding_service.encode_batch_np, texts
+                )
+            if array is not None:
+                for i, valid in enumerate(valid_mask):
+                    if valid:
+                        docs[i]["embedding"] = array[i]
+
+        actions = [
+            {
+                "_op_type": "index",
+                "_index": index_name,
+                "_id": doc.pop("_id"),
+                "_source": doc,
+            }
+            for doc in docs
+        ]
+        return await self._bulk_one(semaphore, actions)
+
+    async def _bulk_one(
+        self, semaphore: asyncio.Semaphore, actions: List[Dict[str, Any]]
+    ) -> int:
+        """
+        Stream one sub-batch of bulk actions, retrying 429 rejections.
+
+        Args:
+            semaphore: Bounds concurrent bulk requests
+            actions: Bulk index actions
+
+        Returns:
+            Number of successfully indexed documents
+        """
+        success_count = 0
+        async with semaphore:
+            async for ok, _ in async_streaming_bulk(
+                self.es.options(request_timeout=settings.es_bulk_timeout),
+                actions,
+                chunk_size=settings.es_bulk_chunk_size,
+                max_chunk_bytes=settings.es_bulk_max_bytes,
+                raise_on_error=False,
+                max_retries=3,
+                initial_backoff=0.5,
+            ):
+                if ok:
+                    success_count += 1
+        return success_count
+
+    async def index_many(
+        self,
+        items_by_user: Dict[str, List[Dict[str, Any]]],
+        generate_embeddings: bool = True,
+    ) -> int:
+        """
+        Index news items for several users with one embedding pass.
+
+        All texts are encoded in a single ``encode_batch_np`` call so the model's
+        per-call overhead is paid once, then each user's slice is bulk-indexed.
+
+        Args:
+            items_by_user: News documents grouped by user ID
+            generate_embeddings: Whether to generate embeddings
+
+        Returns:
+            Number of successfully indexed items
+        """
+        embeddings: Optional[List[Optional[Any]]] = None
+        if generate_embeddings and await self._embeddings_available():
+            array, valid_mask = await asyncio.to_thread(
+                embedding_service.encode_batch_np,
+                [
+                    self._get_text_for_embedding(item)
+                    for items in items_by_user.values()
+                    for item in items
+                ],
+            )
+            if array is not None:
+                embeddings = [
+                    array[i] if valid else None
+                    for i, valid in enumerate(valid_mask)
+                ]
+
+        indexed = 0
+        offset = 0
+        for user_id, items in items_by_user.items():
+            user_embeddings = None
+            if embeddings is not None:
+                user_embeddings = embeddings[offset:offset + len(items)]
+            offset += len(items)
+            indexed += await self.index_batch(
+                user_id,
+                items,
+                generate_embeddings=False,
+                precomputed_embeddings=user_embeddings,
+            )
+        return indexed
+
     async def update_state(
         self,
         user_id: str,
@@ -225,9 +532,13 @@ class ESIndexer:
         index_name = self._get_index_name(user_id)
 
         try:
+            # One slice per shard deletes in parallel; documents changed by
+            # concurrent indexing are skipped instead of aborting the delete
             response = await self.es.delete_by_query(
                 index=index_name,
                 query={"term": {"source_id": source_id}},
+                slices="auto",
+                conflicts="proceed",
             )
             deleted = response.get("deleted", 0)
             logger.info(f"Deleted {deleted} ES documents for source {source_id}")
@@ -238,25 +549,40 @@ class ESIndexer:
 
     def _prepare_document(self, doc: Dict[str, Any]) -> Dict[str, Any]:
         """Prepare MongoDB document for ES indexing."""
+        # Called once per document on bulk paths: bind the lookups once
+        g = doc.get
+        metadata = g("metadata") or {}
+        crawled_at = g("crawled_at")
+        if crawled_at is None and "crawled_at" not in doc:
+            crawled_at = datetime.utcnow()
         return {
-            "user_id": doc.get("user_id", ""),
-            "source_id": doc.get("source_id", ""),
-            "source_name": doc.get("source_name", ""),
-            "source_type": doc.get("source_type", ""),
-            "title": doc.get("title", ""),
-            "url": doc.get("url", ""),
-            "description": doc.get("description"),
-            "content": doc.get("content"),
-            "image_url": doc.get("image_url"),
-            "tags": doc.get("tags", []),
-            "published_at": doc.get("published_at"),
-            "crawled_at": doc.get("crawled_at", datetime.utcnow()),
-            "hot_score": doc.get("metadata", {}).get("hot_score", 0.0),
-            "view_count": doc.get("metadata", {}).get("view_count", 0),
-            "is_read": doc.get("is_read", False),
-            "is_starred": doc.get("is_starred", False),
+            "user_id": g("user_id", ""),
+            "source_id": g("source_id", ""),
+            "source_name": g("source_name", ""),
+            "source_type": g("source_type", ""),
+            "title": g("title", ""),
+            "url": g("url", ""),
+            "description": g("description"),
+            "content": g("content"),
+            "image_url": g("image_url"),
+            "tags": g("tags", []),
+            "published_at": g("published_at"),
+            "crawled_at": crawled_at,
+            "hot_score": metadata.get("hot_score", 0.0),
+            "view_count": metadata.get("view_count", 0),
+            "is_read": g("is_read", False),
+            "is_starred": g("is_starred", False),
         }
 
+    @staticmethod
+    async def _embeddings_available() -> bool:
+        """Check the embedding model in a worker thread.
+
+        The first check loads the model, which would otherwise stall the
+        event loop for every request.
+        """
+        return await asyncio.to_thread(lambda: embedding_service.is_available)
+
     def _get_text_for_embedding(self, doc: Dict[str, Any]) -> str:
         """Extract text for embedding generation."""
         parts = [doc.get("title", "")]
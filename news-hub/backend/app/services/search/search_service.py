@@ -5,10 +5,16 @@ Provides keyword search, semantic search, and hybrid search over news items.
 Uses Elasticsearch for full-text and vector search.
 """
 
+import base64
+import hmac
+import time
+from collections import OrderedDict
 from dataclasses import dataclass
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from hashlib import blake2b
+from typing import Any, Dict, List, Optional, Tuple
 
+import orjson
 from elasticsearch import AsyncElasticsearch
 from loguru import logger
 
@@ -16,6 +22,38 @@ from app.core.config import settings
 from app.db.es import es_client
 from app.services.search.embedding import embedding_service
 
+# ciso8601 parses the ISO 8601 dates stored in ES in C, far faster than
+# fromisoformat() on a "Z"-substituted copy of each string.
+try:
+    from ciso8601 import parse_datetime as _parse_iso_datetime
+except ImportError:
+
+    def _parse_iso_datetime(value: str) -> datetime:
+        return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+# Static parts of the search bodies, built once and shared by every request
+# (treat as read-only); only the query, vector, filters and paging vary.
+_SOURCE_FILTER = {"excludes": ["embedding", "content"]}
+_HIGHLIGHT_FIELDS = {
+    "title": {"number_of_fragments": 0},
+    "description": {"number_of_fragments": 2, "fragment_size": 150},
+}
+_HIGHLIGHT = {
+    "fields": _HIGHLIGHT_FIELDS,
+    "pre_tags": ["<mark>"],
+    "post_tags": ["</mark>"],
+}
+_HIGHLIGHT_WITH_CONTENT = {
+    **_HIGHLIGHT,
+    "fields": {
+        **_HIGHLIGHT_FIELDS,
+        "content": {"number_of_fragments": 2, "fragment_size": 150},
+    },
+}
+_FUZZY_FIELDS = ["title^3", "tags^2"]
+_EXACT_FIELDS = ["description^2", "content"]
+
 
 @dataclass
 class SearchResult:
@@ -46,6 +84,7 @@ class SearchResponse:
     results: List[SearchResult]
     took_ms: int
     search_type: str  # "keyword", "semantic", "hybrid"
+    next_cursor: Optional[str] = None
 
 
 class SearchService:
@@ -59,6 +98,13 @@ class SearchService:
     - Autocomplete suggestions
     """
 
+    # Autocomplete results keyed by (user_id, prefix, size) as
+    # (expires_at, suggestions), in LRU order. Shared by all instances since
+    # a service is built per request.
+    _suggest_cache: "OrderedDict[Tuple[str, str, int], Tuple[float, List[str]]]" = (
+        OrderedDict()
+    )
+
     def __init__(self, es: AsyncElasticsearch):
         """
         Initialize search service.
@@ -84,6 +130,8 @@ class SearchService:
         end_date: Optional[datetime] = None,
         page: int = 1,
         page_size: int = 20,
+        highlight_content: bool = False,
+        cursor: Optional[str] = None,
     ) -> SearchResponse:
         """
         Search news items.
@@ -99,6 +147,9 @@ class SearchService:
             end_date: Filter to date
             page: Page number (1-based)
             page_size: Results per page
+            highlight_content: Also return keyword highlights from content
+            cursor: ``next_cursor`` of the previous keyword search page, or
+                an empty string to start cursor paging
 
         Returns:
             SearchResponse with results
@@ -121,7 +172,8 @@ class SearchService:
             )
         elif search_type == "keyword":
             return await self._keyword_search(
-                index_name, query, filters, page, page_size
+                index_name, query, filters, page, page_size, highlight_content,
+                cursor,
             )
         else:  # hybrid
             return await self._hybrid_search(
@@ -135,47 +187,79 @@ class SearchService:
         filters: List[Dict[str, Any]],
         page: int,
         page_size: int,
+        highlight_content: bool = False,
+        cursor: Optional[str] = None,
     ) -> SearchResponse:
-        """Execute keyword (BM25) search."""
-        body = {
+        """
+        Execute keyword (BM25) search.
+
+        With cursor paging, pages are fetched with ``search_after`` on a
+        point in time, so ES does not collect and discard ``from`` hits per
+        shard. An empty ``cursor`` opens the point in time and returns a
+        ``next_cursor``; later pages pass it back. The point in time is
+        closed as soon as no further cursor is handed out.
+        """
+        body: Dict[str, Any] = {
             "query": {
                 "bool": {
-                    "must": [
-                        {
-                            "multi_match": {
-                                "query": query,
-                                "fields": [
-                                    "title^3",
-                                    "description^2",
-                                    "content",
-                                    "tags^2",
-                                ],
-                                "type": "best_fields",
-                                "fuzziness": "AUTO",
-                            }
-                        }
-                    ],
+                    "must": [self._build_text_query(query)],
                     "filter": filters,
                 }
             },
-            "highlight": {
-                "fields": {
-                    "title": {"number_of_fragments": 0},
-                    "description": {"number_of_fragments": 2, "fragment_size": 150},
-                    "content": {"number_of_fragments": 2, "fragment_size": 150},
-                },
-                "pre_tags": ["<mark>"],
-                "post_tags": ["</mark>"],
-            },
-            "from": (page - 1) * page_size,
+            "highlight": _HIGHLIGHT_WITH_CONTENT if highlight_content else _HIGHLIGHT,
             "size": page_size,
-            "_source": {"excludes": ["embedding", "content"]},
+            "_source": _SOURCE_FILTER,
         }
 
+        pit_id = None
+        search_after = None
+        if cursor:
+            decoded = self._decode_cursor(cursor, index_name)
+            if decoded is not None:
+                pit_id, search_after = decoded
+        elif cursor is not None:
+            try:
+                pit = await self.es.open_point_in_time(
+                    index=index_name, keep_alive=settings.search_pit_keep_alive
+                )
+                pit_id = pit["id"]
+            except Exception as e:
+                logger.warning(f"Could not open point in time: {e}")
+
+        if pit_id is not None:
+            body["pit"] = {"id": pit_id, "keep_alive": settings.search_pit_keep_alive}
+            body["sort"] = [{"_score": "desc"}, {"_shard_doc": "asc"}]
+            body["track_scores"] = True
+        if search_after is not None:
+            body["search_after"] = search_after
+        else:
+            body["from"] = (page - 1) * page_size
+
         try:
-            response = await self.es.search(index=index_name, body=body)
-            return self._parse_response(response, query, "keyword")
+            response = await self.es.search(
+                index=None if pit_id is not None else index_name, body=body
+            )
+            result = self._parse_response(response, query, "keyword")
+            hits = response["hits"]["hits"]
+            if pit_id is not None:
+                pit_id = response.get("pit_id", pit_id)
+                if len(hits) == page_size:
+                    result.next_cursor = self._encode_cursor(
+                        index_name, pit_id, hits[-1]["sort"]
+                    )
+                else:
+                    # Last page: nobody will come back for this point in time
+                    await self._close_pit(pit_id)
+            return result
         except Exception as e:
+            if pit_id is not None:
+                await self._close_pit(pit_id)
+            if cursor:
+                # Expired point in time: serve the page by offset instead
+                logger.warning(f"Cursor search failed, using offset paging: {e}")
+                return await self._keyword_search(
+                    index_name, query, filters, page, page_size, highlight_content
+                )
             logger.error(f"Keyword search error: {e}")
             return SearchResponse(
                 query=query,
@@ -185,6 +269,13 @@ class SearchService:
                 search_type="keyword",
             )
 
+    async def _close_pit(self, pit_id: str) -> None:
+        """Release a point in time; it would otherwise live for its keep-alive."""
+        try:
+            await self.es.close_point_in_time(id=pit_id)
+        except Exception as e:
+            logger.debug(f"Could not close point in time: {e}")
+
     async def _semantic_search(
         self,
         index_name: str,
@@ -195,7 +286,7 @@ class SearchService:
     ) -> SearchResponse:
         """Execute semantic (vector) search."""
         # Generate query embedding
-        query_vector = embedding_service.encode_for_search(query)
+        query_vector = await embedding_service.encode_for_search_async(query)
 
         if query_vector is None:
             logger.warning("Embedding unavailable, falling back to keyword search")
@@ -203,26 +294,12 @@ class SearchService:
                 index_name, query, filters, page, page_size
             )
 
+        # Approximate kNN over the HNSW index instead of scoring every doc
         body = {
-            "query": {
-                "bool": {
-                    "must": [
-                        {
-                            "script_score": {
-                                "query": {"match_all": {}},
-                                "script": {
-                                    "source": "cosineSimilarity(params.query_vector, 'embedding') + 1.0",
-                                    "params": {"query_vector": query_vector},
-                                },
-                            }
-                        }
-                    ],
-                    "filter": filters + [{"exists": {"field": "embedding"}}],
-                }
-            },
+            "knn": self._build_knn(query_vector, filters, page, page_size),
             "from": (page - 1) * page_size,
             "size": page_size,
-            "_source": {"excludes": ["embedding", "content"]},
+            "_source": _SOURCE_FILTER,
         }
 
         try:
@@ -249,9 +326,10 @@ class SearchService:
         """
         Execute hybrid search combining keyword and semantic.
 
-        Uses ES 8.x knn combined with text query.
+        Uses ES 8.x knn combined with text query; the scores of both parts
+        are summed for documents matched by either.
         """
-        query_vector = embedding_service.encode_for_search(query)
+        query_vector = await embedding_service.encode_for_search_async(query)
 
         # If no embedding available, fall back to keyword
         if query_vector is None:
@@ -259,55 +337,26 @@ class SearchService:
                 index_name, query, filters, page, page_size
             )
 
-        # Hybrid query using bool with should
+        # Keyword query plus approximate kNN
         body = {
             "query": {
                 "bool": {
-                    "should": [
+                    "must": [
                         # Keyword component (weighted)
-                        {
-                            "multi_match": {
-                                "query": query,
-                                "fields": [
-                                    "title^3",
-                                    "description^2",
-                                    "content",
-                                    "tags^2",
-                                ],
-                                "type": "best_fields",
-                                "fuzziness": "AUTO",
-                                "boost": 1.0,
-                            }
-                        },
-                        # Semantic component (weighted)
-                        {
-                            "script_score": {
-                                "query": {"exists": {"field": "embedding"}},
-                                "script": {
-                                    "source": "(cosineSimilarity(params.query_vector, 'embedding') + 1.0) * params.boost",
-                                    "params": {
-                                        "query_vector": query_vector,
-                                        "boost": 2.0,  # Semantic weight
-                                    },
-                                },
-                            }
-                        },
+                        self._build_text_query(query),
                     ],
                     "filter": filters,
-                    "minimum_should_match": 1,
                 }
             },
-            "highlight": {
-                "fields": {
-                    "title": {"number_of_fragments": 0},
-                    "description": {"number_of_fragments": 2, "fragment_size": 150},
-                },
-                "pre_tags": ["<mark>"],
-                "post_tags": ["</mark>"],
-            },
+            # Semantic component (weighted); knn cosine scores lie in [0, 1],
+            # so a boost of 4 keeps the former (cos + 1) * 2 weighting
+            "knn": self._build_knn(
+                query_vector, filters, page, page_size, boost=4.0
+            ),
+            "highlight": _HIGHLIGHT,
             "from": (page - 1) * page_size,
             "size": page_size,
-            "_source": {"excludes": ["embedding", "content"]},
+            "_source": _SOURCE_FILTER,
         }
 
         try:
@@ -320,6 +369,137 @@ class SearchService:
                 index_name, query, filters, page, page_size
             )
 
+    @staticmethod
+    def _sign_cursor(payload: bytes) -> bytes:
+        """Keyed digest binding a cursor to this deployment."""
+        return blake2b(
+            payload, key=settings.secret_key.encode()[:64], digest_size=16
+        ).digest()
+
+    @classmethod
+    def _encode_cursor(
+        cls, index_name: str, pit_id: str, sort_values: List[Any]
+    ) -> str:
+        """
+        Build the opaque cursor for the page after ``sort_values``.
+
+        Args:
+            index_name: Index the point in time was opened on
+            pit_id: Point-in-time ID
+            sort_values: Sort values of the last hit on the page
+
+        Returns:
+            URL-safe cursor string
+        """
+        payload = orjson.dumps({"i": index_name, "p": pit_id, "a": sort_values})
+        return base64.urlsafe_b64encode(cls._sign_cursor(payload) + payload).decode()
+
+    @classmethod
+    def _decode_cursor(
+        cls, cursor: str, index_name: str
+    ) -> Optional[Tuple[str, List[Any]]]:
+        """
+        Validate a cursor and unpack it.
+
+        Cursors that are malformed, tampered with or issued for another
+        user's index are ignored.
+
+        Args:
+            cursor: Cursor from a previous response
+            index_name: Index of the current request
+
+        Returns:
+            Tuple of point-in-time ID and search_after values, or None
+        """
+        try:
+            raw = base64.urlsafe_b64decode(cursor.encode())
+            signature, payload = raw[:16], raw[16:]
+            if not hmac.compare_digest(signature, cls._sign_cursor(payload)):
+                return None
+            data = orjson.loads(payload)
+        except (ValueError, TypeError):
+            return None
+        if data.get("i") != index_name:
+            return None
+        return data["p"], data["a"]
+
+    @staticmethod
+    def _build_text_query(query: str) -> Dict[str, Any]:
+        """
+        Build the BM25 text clause shared by keyword and hybrid search.
+
+        Fuzzy matching is limited to the short title/tags fields; expanding
+        every query term against the large description/content term
+        dictionaries dominates query time for little recall gain.
+
+        Args:
+            query: Search query text
+
+        Returns:
+            ES bool query matching at least one of the clauses
+        """
+        return {
+            "bool": {
+                "should": [
+                    {
+                        "multi_match": {
+                            "query": query,
+                            "fields": _FUZZY_FIELDS,
+                            "type": "best_fields",
+                            "fuzziness": "AUTO",
+                            "prefix_length": 2,
+                            "max_expansions": 50,
+                        }
+                    },
+                    {
+                        "multi_match": {
+                            "query": query,
+                            "fields": _EXACT_FIELDS,
+                            "type": "best_fields",
+                            "fuzziness": 0,
+                        }
+                    },
+                ],
+                "minimum_should_match": 1,
+            }
+        }
+
+    @staticmethod
+    def _build_knn(
+        query_vector: List[float],
+        filters: List[Dict[str, Any]],
+        page: int,
+        page_size: int,
+        boost: float = 1.0,
+    ) -> Dict[str, Any]:
+        """
+        Build a top-level ``knn`` clause for the embedding field.
+
+        ``k`` covers every hit up to the requested page so ``from``/``size``
+        paging still works.
+
+        Args:
+            query_vector: Query embedding
+            filters: Filter clauses applied during the vector search
+            page: Page number (1-based)
+            page_size: Results per page
+            boost: Weight of the vector score
+
+        Returns:
+            knn clause
+        """
+        k = page * page_size
+        knn: Dict[str, Any] = {
+            "field": "embedding",
+            "query_vector": query_vector,
+            "k": k,
+            "num_candidates": max(100, page_size * 10, k),
+            "boost": boost,
+        }
+        if filters:
+            knn["filter"] = filters
+        return knn
+
     async def suggest(
         self,
         user_id: str,
@@ -337,6 +517,14 @@ class SearchService:
         Returns:
             List of suggested titles
         """
+        # Keystrokes repeat the same prefixes; answer those from memory
+        key = (user_id, prefix.lower(), size)
+        now = time.monotonic()
+        cached = self._suggest_cache.get(key)
+        if cached and cached[0] > now:
+            self._suggest_cache.move_to_end(key)
+            return list(cached[1])
+
         index_name = self._get_index_name(user_id)
 
         body = {
@@ -362,11 +550,17 @@ class SearchService:
             for suggest_item in suggest_data:
                 for option in suggest_item.get("options", []):
                     suggestions.append(option.get("text", ""))
-            return suggestions
         except Exception as e:
             logger.error(f"Suggest error: {e}")
             return []
 
+        if settings.suggest_cache_size > 0:
+            self._suggest_cache[key] = (now + settings.suggest_cache_ttl, suggestions)
+            self._suggest_cache.move_to_end(key)
+            while len(self._suggest_cache) > settings.suggest_cache_size:
+                self._suggest_cache.popitem(last=False)
+        return list(suggestions)
+
     def _build_filters(
         self,
         source_ids: Optional[List[str]] = None,
@@ -417,18 +611,14 @@ class SearchService:
             published_at = None
             if source.get("published_at"):
                 try:
-                    published_at = datetime.fromisoformat(
-                        source["published_at"].replace("Z", "+00:00")
-                    )
+                    published_at = _parse_iso_datetime(source["published_at"])
                 except (ValueError, TypeError):
                     pass
 
             crawled_at = datetime.utcnow()
             if source.get("crawled_at"):
                 try:
-                    crawled_at = datetime.fromisoformat(
-                        source["crawled_at"].replace("Z", "+00:00")
-                    )
+                    crawled_at = _parse_iso_datetime(source["crawled_at"])
                 except (ValueError, TypeError):
                     pass
 
@@ -4,11 +4,16 @@ Source Detection Service
 Analyzes URLs to determine source type (RSS, API, HTML) and suggest parser configuration.
 """
 
+import asyncio
+import io
 import re
-from typing import Any, Dict, List, Optional
+from collections import deque
+from typing import Any, Dict, List, Optional, Tuple
 from urllib.parse import urlparse
 
 import httpx
+import soupsieve
+from bs4 import BeautifulSoup, SoupStrainer
 from loguru import logger
 
 from app.schemas.source import (
@@ -18,6 +23,107 @@ from app.schemas.source import (
     SourceDetectResponse,
     SourceType,
 )
+from app.services.collector.base import get_http_client
+
+# lxml parses pages several times faster; fall back to the stdlib parser
+try:
+    from lxml import etree
+
+    _HTML_PARSER = "lxml"
+except ImportError:
+    etree = None
+    _HTML_PARSER = "html.parser"
+
+# Type sniffing only looks at the start of the body; parsers get at most
+# MAX_DETECT_BYTES so a huge page or feed cannot be pulled into memory whole.
+SNIFF_BYTES = 64 * 1024
+MAX_DETECT_BYTES = 2 * 1024 * 1024
+
+# Feed root elements, and markers telling a feed from other XML (e.g. XHTML)
+_FEED_PREFIXES = (b"<rss", b"<feed", b"<rdf:rdf")
+_FEED_MARKERS = re.compile(rb"<rss|<feed|<rdf:rdf|<channel>|xmlns:atom", re.I)
+
+# Feed preview: number of entries shown, and the elements that carry a
+# publication date (RSS pubDate, Atom published, Dublin Core date)
+FEED_PREVIEW_ITEMS = 3
+_FEED_DATE_TAGS = ("pubDate", "published", "issued", "date")
+
+# Common article container patterns, in order of preference, as
+# (list selector, link selector). All are matched in one tree walk.
+_ARTICLE_PATTERNS = (
+    ("article", "a"),
+    (".article", "a"),
+    (".post", "a"),
+    (".news-item", "a"),
+    (".item", "a"),
+    ("[class*='article']", "a"),
+    ("[class*='post']", "a"),
+    ("li.item", "a"),
+    (".list-item", "a"),
+)
+_ARTICLE_SELECTORS = tuple(soupsieve.compile(sel) for sel, _ in _ARTICLE_PATTERNS)
+_ARTICLE_COMBINED = soupsieve.compile(", ".join(sel for sel, _ in _ARTICLE_PATTERNS))
+_TITLE_SELECTOR = soupsieve.compile("h1, h2, h3, h4, .title, [class*='title']")
+
+# JSON list search: common list field names, checked before any other key,
+# and bounds on how far into an API payload the search goes
+_LIST_PRIORITY_KEYS = (
+    "items",
+    "data",
+    "results",
+    "articles",
+    "news",
+    "posts",
+    "entries",
+    "list",
+)
+JSON_SEARCH_MAX_DEPTH = 4
+JSON_SEARCH_MAX_NODES = 1000
+
+# Candidate keys for API field mappings, in order of preference
+_FIELD_KEYS = (
+    ("title", ("title", "headline", "name", "subject")),
+    ("link", ("url", "link", "href", "uri", "permalink")),
+    (
+        "content",
+        ("content", "body", "text", "description", "summary", "excerpt"),
+    ),
+    (
+        "published_at",
+        (
+            "published",
+            "publishedAt",
+            "created_at",
+            "date",
+            "time",
+            "timestamp",
+            "pubDate",
+        ),
+    ),
+    ("author", ("author", "creator", "writer", "by")),
+)
+
+
+class _ArticleStrainer(SoupStrainer):
+    """
+    Tell BeautifulSoup which top-level elements to build.
+
+    Every article pattern matches an ``<article>``, an ``<li>`` or an element
+    with a class, so only those (with their whole subtree) and ``<title>``
+    are kept; the rest of the page is never turned into a tree.
+    """
+
+    @staticmethod
+    def _keep(name: str, attrs: Optional[Dict[str, Any]]) -> bool:
+        return name in ("title", "article", "li") or bool(attrs and "class" in attrs)
+
+    # bs4 < 4.13 consults search_tag while parsing, later versions
+    # allow_tag_creation
+    def search_tag(self, markup_name=None, markup_attrs={}):
+        return self._keep(markup_name, markup_attrs)
+
+    def allow_tag_creation(self, nsprefix, name, attrs):
+        return self._keep(name, attrs)
 
 
 class SourceDetector:
@@ -36,25 +142,28 @@ class SourceDetector:
         Returns detected type, suggested name, and parser config.
         """
         try:
-            async with httpx.AsyncClient(
-                timeout=self.timeout, follow_redirects=True
-            ) as client:
-                response = await client.get(url, headers=self.headers)
+            # Pooled client shared with the collectors, which fetch the same
+            # URLs once the source is added
+            client = await get_http_client()
+            async with client.stream(
+                "GET", url, headers=self.headers, timeout=self.timeout
+            ) as response:
                 response.raise_for_status()
-
                 content_type = response.headers.get("content-type", "").lower()
-                content = response.text
+                body = await self._read_limited(response)
+                encoding = response.encoding or "utf-8"
+
+            source_type = self._classify(content_type, body[:SNIFF_BYTES])
+            content = body.decode(encoding, errors="replace")
 
-                # Try RSS/Atom detection first
-                if self._is_rss_feed(content_type, content):
-                    return await self._detect_rss(url, content)
+            if source_type == SourceType.RSS:
+                return await self._detect_rss(url, content, body)
 
-                # Try JSON API detection
-                if self._is_json_response(content_type, content):
-                    return await self._detect_api(url, content)
+            if source_type == SourceType.API:
+                return await self._detect_api(url, content)
 
-                # Default to HTML scraping
-                return await self._detect_html(url, content)
+            # Default to HTML scraping
+            return await self._detect_html(url, content)
 
         except httpx.TimeoutException:
             logger.warning(f"Timeout detecting source: {url}")
@@ -69,38 +178,205 @@ class SourceDetector:
                 confidence=0.0,
             )
 
-    def _is_rss_feed(self, content_type: str, content: str) -> bool:
-        """Check if response is an RSS/Atom feed."""
-        # Check content type
-        if any(t in content_type for t in ["xml", "rss", "atom"]):
-            return True
+    async def detect_many(
+        self, urls: List[str], max_concurrency: int = 10
+    ) -> List[SourceDetectResponse]:
+        """
+        Detect several URLs concurrently.
 
-        # Check content for RSS/Atom markers
-        content_lower = content[:2000].lower()
-        rss_markers = ["<rss", "<feed", "<channel>", "xmlns:atom", "application/rss"]
-        return any(marker in content_lower for marker in rss_markers)
+        Fetches share the pooled HTTP client; a semaphore bounds how many
+        run at once.
 
-    def _is_json_response(self, content_type: str, content: str) -> bool:
-        """Check if response is JSON."""
-        if "json" in content_type:
-            return True
+        Args:
+            urls: URLs to analyze
+            max_concurrency: Maximum detections in flight
+
+        Returns:
+            One detection result per URL, in input order
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def detect_one(url: str) -> SourceDetectResponse:
+            async with semaphore:
+                return await self.detect(url)
 
-        # Try to detect JSON structure
-        content_stripped = content.strip()
-        return content_stripped.startswith("{") or content_stripped.startswith("[")
+        results = await asyncio.gather(
+            *(detect_one(url) for url in urls), return_exceptions=True
+        )
+        responses = []
+        for url, result in zip(urls, results):
+            if isinstance(result, BaseException):
+                logger.error(f"Error detecting source {url}: {result}")
+                result = SourceDetectResponse(
+                    detected_type=SourceType.HTML,
+                    confidence=0.0,
+                )
+            responses.append(result)
+        return responses
+
+    @staticmethod
+    async def _read_limited(response: httpx.Response) -> bytes:
+        """
+        Read a streamed response body, stopping at MAX_DETECT_BYTES.
+
+        Args:
+            response: Open streaming response
+
+        Returns:
+            Body bytes, truncated to MAX_DETECT_BYTES
+        """
+        chunks: List[bytes] = []
+        total = 0
+        async for chunk in response.aiter_bytes(SNIFF_BYTES):
+            chunks.append(chunk)
+            total += len(chunk)
+            if total >= MAX_DETECT_BYTES:
+                break
+        return b"".join(chunks)[:MAX_DETECT_BYTES]
+
+    @staticmethod
+    def _classify(content_type: str, head: bytes) -> SourceType:
+        """
+        Classify a response from the first bytes of its body.
+
+        The body's leading bytes decide: ``{``/``[`` is JSON, a feed root
+        element (or an XML declaration followed by feed markers) is RSS/Atom.
+        The content type only breaks ties for bodies that do neither, so an
+        HTML page advertising its feed in a ``<link>`` stays HTML.
+
+        Args:
+            content_type: Lowercased Content-Type header
+            head: Start of the response body
 
-    async def _detect_rss(self, url: str, content: str) -> SourceDetectResponse:
+        Returns:
+            Detected source type
+        """
+        start = head[:256]
+        if start.startswith(b"\xef\xbb\xbf"):
+            start = start[3:]
+        start = start.lstrip()
+
+        if start[:1] in (b"{", b"["):
+            return SourceType.API
+        lowered = start[:8].lower()
+        if lowered.startswith(_FEED_PREFIXES):
+            return SourceType.RSS
+        if lowered.startswith(b"<?xml") and _FEED_MARKERS.search(head, 0, 2000):
+            return SourceType.RSS
+
+        if "json" in content_type:
+            return SourceType.API
+        if "html" not in content_type and any(
+            t in content_type for t in ("xml", "rss", "atom")
+        ):
+            return SourceType.RSS
+        return SourceType.HTML
+
+    async def _detect_rss(
+        self, url: str, content: str, body: bytes
+    ) -> SourceDetectResponse:
         """Detect RSS feed details."""
+        sniffed = self._sniff_feed(body)
+        if sniffed is not None:
+            title, preview_items = sniffed
+        else:
+            title, preview_items = self._parse_feed(content)
+        suggested_name = title or self._extract_domain(url)
+
+        return SourceDetectResponse(
+            detected_type=SourceType.RSS,
+            suggested_name=suggested_name,
+            suggested_config=None,  # RSS doesn't need config
+            preview_items=preview_items,
+            confidence=0.95,
+        )
+
+    @staticmethod
+    def _sniff_feed(body: bytes) -> Optional[Tuple[Optional[str], List[Dict]]]:
+        """
+        Read the feed title and first entries with a streaming XML parse.
+
+        Parsing stops once FEED_PREVIEW_ITEMS entries have been seen, so
+        only a prefix of a large feed is ever processed.
+
+        Args:
+            body: Raw feed bytes
+
+        Returns:
+            (feed title, preview items), or None if lxml is unavailable or
+            the document is not well-formed XML
+        """
+        if etree is None:
+            return None
+
+        title: Optional[str] = None
+        preview_items: List[Dict] = []
+        events = etree.iterparse(
+            io.BytesIO(body),
+            events=("end",),
+            tag=("{*}title", "{*}item", "{*}entry"),
+            resolve_entities=False,
+            no_network=True,
+        )
+        try:
+            for _, elem in events:
+                name = etree.QName(elem).localname
+                if name == "title":
+                    parent = elem.getparent()
+                    if title is None and parent is not None and etree.QName(
+                        parent
+                    ).localname in ("channel", "feed"):
+                        title = (elem.text or "").strip()
+                    continue
+
+                fields = {"title": "", "link": "", "published": ""}
+                for child in elem:
+                    if not isinstance(child.tag, str):
+                        continue
+                    child_name = etree.QName(child).localname
+                    text = (child.text or "").strip()
+                    if child_name == "title" and not fields["title"]:
+                        fields["title"] = text
+                    elif (
+                        child_name == "link"
+                        and not fields["link"]
+                        and child.get("rel", "alternate") == "alternate"
+                    ):
+                        # Atom links carry the URL in href
+                        fields["link"] = child.get("href", text).strip()
+                    elif child_name in _FEED_DATE_TAGS and not fields["published"]:
+                        fields["published"] = text
+                preview_items.append(fields)
+                elem.clear()
+                if len(preview_items) >= FEED_PREVIEW_ITEMS:
+                    break
+        except etree.LxmlError:
+            return None
+
+        return title or None, preview_items
+
+    @staticmethod
+    def _parse_feed(content: str) -> Tuple[Optional[str], List[Dict]]:
+        """
+        Read the feed title and first entries with feedparser.
+
+        Used when the streaming parse fails; feedparser tolerates
+        malformed feeds but parses the whole document.
+
+        Args:
+            content: Decoded feed text
+
+        Returns:
+            (feed title, preview items)
+        """
         import feedparser
 
         feed = feedparser.parse(content)
 
         # feedparser returns FeedParserDict which supports .get()
-        feed_data = feed.feed
-        suggested_name = getattr(feed_data, "title", None) or self._extract_domain(url)
+        title = getattr(feed.feed, "title", None)
         preview_items = []
-
-        for entry in feed.entries[:3]:
+        for entry in feed.entries[:FEED_PREVIEW_ITEMS]:
             preview_items.append(
                 {
                     "title": getattr(entry, "title", ""),
@@ -108,14 +384,7 @@ class SourceDetector:
                     "published": getattr(entry, "published", ""),
                 }
             )
-
-        return SourceDetectResponse(
-            detected_type=SourceType.RSS,
-            suggested_name=suggested_name,
-            suggested_config=None,  # RSS doesn't need config
-            preview_items=preview_items,
-            confidence=0.95,
-        )
+        return title, preview_items
 
     async def _detect_api(self, url: str, content: str) -> SourceDetectResponse:
         """Detect JSON API structure."""
@@ -169,9 +438,7 @@ class SourceDetector:
 
     async def _detect_html(self, url: str, content: str) -> SourceDetectResponse:
         """Detect HTML page structure for scraping."""
-        from bs4 import BeautifulSoup
-
-        soup = BeautifulSoup(content, "html.parser")
+        soup = BeautifulSoup(content, _HTML_PARSER, parse_only=_ArticleStrainer())
 
         # Extract page title
         title_tag = soup.find("title")
@@ -198,7 +465,7 @@ class SourceDetector:
             items = soup.select(list_selector)[:3]
             for item in items:
                 link = item.select_one(link_selector or "a")
-                title_el = item.select_one("h1, h2, h3, h4, .title, [class*='title']")
+                title_el = _TITLE_SELECTOR.select_one(item)
                 preview_items.append(
                     {
                         "title": title_el.text.strip() if title_el else "",
@@ -221,89 +488,57 @@ class SourceDetector:
         return domain.split(".")[0].title()
 
     def _find_list_in_json(self, data: Any, path: str = "") -> tuple:
-        """Recursively find a list of items in JSON structure."""
-        if isinstance(data, list) and len(data) > 0:
-            if isinstance(data[0], dict):
+        """
+        Find the first list of objects in a JSON structure.
+
+        Searches breadth-first, so the shallowest list wins; at each level the
+        common list names are tried before other keys. The search stops at
+        JSON_SEARCH_MAX_DEPTH levels and JSON_SEARCH_MAX_NODES objects.
+
+        Args:
+            data: Parsed JSON document
+            path: Dotted path of ``data`` within the document
+
+        Returns:
+            (dotted path, list) or (None, None) if no list of objects is found
+        """
+        if isinstance(data, list):
+            if data and isinstance(data[0], dict):
                 return path or "@", data
             return None, None
 
-        if isinstance(data, dict):
-            # Common list field names
-            priority_keys = [
-                "items",
-                "data",
-                "results",
-                "articles",
-                "news",
-                "posts",
-                "entries",
-                "list",
-            ]
-
-            for key in priority_keys:
-                if key in data and isinstance(data[key], list):
-                    new_path = f"{path}.{key}" if path else key
-                    return new_path, data[key]
-
-            # Check all keys
-            for key, value in data.items():
-                if (
-                    isinstance(value, list)
-                    and len(value) > 0
-                    and isinstance(value[0], dict)
-                ):
-                    new_path = f"{path}.{key}" if path else key
-                    return new_path, value
+        queue = deque([(data, path, 0)])
+        visited = 0
+        while queue and visited < JSON_SEARCH_MAX_NODES:
+            node, node_path, depth = queue.popleft()
+            visited += 1
+            if not isinstance(node, dict):
+                continue
+
+            for key in _LIST_PRIORITY_KEYS:
+                value = node.get(key)
+                if isinstance(value, list) and value and isinstance(value[0], dict):
+                    return (f"{node_path}.{key}" if node_path else key), value
+
+            for key, value in node.items():
+                if isinstance(value, list):
+                    if value and isinstance(value[0], dict):
+                        return (f"{node_path}.{key}" if node_path else key), value
+                elif isinstance(value, dict) and depth < JSON_SEARCH_MAX_DEPTH:
+                    queue.append(
+                        (value, f"{node_path}.{key}" if node_path else key, depth + 1)
+                    )
 
         return None, None
 
     def _suggest_field_mappings(self, sample_item: Dict[str, Any]) -> Dict[str, str]:
         """Suggest field mappings based on a sample item."""
         mappings = {}
-
-        # Title field
-        title_keys = ["title", "headline", "name", "subject"]
-        for key in title_keys:
-            if key in sample_item:
-                mappings["title"] = key
-                break
-
-        # Link field
-        link_keys = ["url", "link", "href", "uri", "permalink"]
-        for key in link_keys:
-            if key in sample_item:
-                mappings["link"] = key
-                break
-
-        # Content field
-        content_keys = ["content", "body", "text", "description", "summary", "excerpt"]
-        for key in content_keys:
-            if key in sample_item:
-                mappings["content"] = key
-                break
-
-        # Published date field
-        date_keys = [
-            "published",
-            "publishedAt",
-            "created_at",
-            "date",
-            "time",
-            "timestamp",
-            "pubDate",
-        ]
-        for key in date_keys:
-            if key in sample_item:
-                mappings["published_at"] = key
-                break
-
-        # Author field
-        author_keys = ["author", "creator", "writer", "by"]
-        for key in author_keys:
-            if key in sample_item:
-                mappings["author"] = key
-                break
-
+        for field, keys in _FIELD_KEYS:
+            for key in keys:
+                if key in sample_item:
+                    mappings[field] = key
+                    break
         return mappings
 
     def _extract_jmes_value(self, item: Dict, path: str) -> Any:
@@ -314,22 +549,15 @@ class SourceDetector:
 
     def _find_article_list(self, soup) -> tuple:
         """Find article list selector in HTML."""
-        # Common article container patterns
-        patterns = [
-            ("article", "a"),
-            (".article", "a"),
-            (".post", "a"),
-            (".news-item", "a"),
-            (".item", "a"),
-            ("[class*='article']", "a"),
-            ("[class*='post']", "a"),
-            ("li.item", "a"),
-            (".list-item", "a"),
-        ]
-
-        for list_sel, link_sel in patterns:
-            items = soup.select(list_sel)
-            if len(items) >= 3:  # At least 3 items to be considered a list
+        # One walk collects every candidate; count matches per pattern
+        counts = [0] * len(_ARTICLE_PATTERNS)
+        for element in _ARTICLE_COMBINED.select(soup):
+            for i, selector in enumerate(_ARTICLE_SELECTORS):
+                if selector.match(element):
+                    counts[i] += 1
+
+        for (list_sel, link_sel), count in zip(_ARTICLE_PATTERNS, counts):
+            if count >= 3:  # At least 3 items to be considered a list
                 return list_sel, link_sel
 
         return None, None
@@ -4,7 +4,8 @@ Keyword Extractor
 Jieba-based keyword extraction for Chinese text using TF-IDF and TextRank.
 """
 
-import os
+from collections import OrderedDict
+from hashlib import blake2b
 from pathlib import Path
 from typing import List, Optional, Tuple
 
@@ -14,8 +15,14 @@ from loguru import logger
 _jieba_initialized = False
 
 
-def _init_jieba():
-    """Initialize jieba with custom settings."""
+def init_jieba():
+    """
+    Initialize jieba with custom settings and load its dictionary.
+
+    Called at application startup so the first extraction does not pay the
+    dictionary load. Parallel mode is left off: it forks worker processes
+    per call, which costs more than it saves on news-sized texts.
+    """
     global _jieba_initialized
     if _jieba_initialized:
         return
@@ -29,11 +36,7 @@ def _init_jieba():
         jieba.analyse.set_stop_words(str(stopwords_path))
         logger.debug(f"Loaded stopwords from {stopwords_path}")
 
-    # Enable parallel processing for better performance
-    try:
-        jieba.enable_parallel(4)
-    except Exception:
-        pass  # Parallel not supported on all platforms
+    jieba.initialize()
 
     _jieba_initialized = True
 
@@ -45,6 +48,11 @@ class KeywordExtractor:
     Supports both TF-IDF and TextRank algorithms.
     """
 
+    # Keywords from extract_from_news keyed by (method, top_k, text digest).
+    # Shared by all instances; syndicated stories repeat across feeds.
+    _news_cache: "OrderedDict[Tuple[str, int, bytes], Tuple[str, ...]]" = OrderedDict()
+    _news_cache_size = 10000
+
     def __init__(self, method: str = "tfidf"):
         """
         Initialize keyword extractor.
@@ -52,7 +60,7 @@ class KeywordExtractor:
         Args:
             method: Extraction method ('tfidf' or 'textrank')
         """
-        _init_jieba()
+        init_jieba()
         self.method = method
 
     def extract(
@@ -146,7 +154,22 @@ class KeywordExtractor:
         if not combined_text.strip():
             return []
 
-        return self.extract(combined_text, top_k=top_k, with_weight=False)
+        key = (
+            self.method,
+            top_k,
+            blake2b(combined_text.encode("utf-8"), digest_size=16).digest(),
+        )
+        cache = self._news_cache
+        cached = cache.get(key)
+        if cached is not None:
+            cache.move_to_end(key)
+            return list(cached)
+
+        keywords = self.extract(combined_text, top_k=top_k, with_weight=False)
+        cache[key] = tuple(keywords)
+        if len(cache) > self._news_cache_size:
+            cache.popitem(last=False)
+        return keywords
 
 
 def extract_keywords(
@@ -4,10 +4,34 @@ Rule Matcher
 Matches news items against user-defined tag rules.
 """
 
-from typing import Any, Dict, List, Set, Tuple
+import re
+from typing import Any, Dict, List, Optional, Pattern, Sequence, Set, Tuple
 
 from loguru import logger
 
+# Hyperscan scans a text for every rule keyword in one pass; pyahocorasick
+# (portable, pure C extension) does the same with an Aho-Corasick automaton.
+# Without either, each keyword is checked with a separate substring search,
+# or for long any-mode keyword lists with one compiled regex alternation.
+try:
+    import hyperscan
+except ImportError:
+    hyperscan = None
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+# Bits of a rule's field mask
+FIELD_TITLE = 1
+FIELD_DESCRIPTION = 2
+FIELD_CONTENT = 4
+
+# Any-mode rules with more keywords than this get a regex alternation when
+# no keyword scanner is available
+PATTERN_MIN_KEYWORDS = 8
+
 
 class RuleMatcher:
     """
@@ -27,6 +51,177 @@ class RuleMatcher:
         self.rules = [r for r in rules if r.get("is_active", True)]
         self.rules.sort(key=lambda x: x.get("priority", 0), reverse=True)
 
+        # Distinct keywords across all rules -> pattern ID for the scanner,
+        # plus the keywords used by case-sensitive / case-insensitive rules
+        self._keyword_ids: Dict[str, int] = {}
+        self._mode_keywords: Dict[bool, Dict[str, int]] = {False: {}, True: {}}
+        # FIELD_* bits searched by any rule of each case mode; other fields
+        # are never truncated or case-folded
+        self._mode_fields: Dict[bool, int] = {False: 0, True: 0}
+
+        # Per-rule settings resolved once, keywords pre-casefolded when the rule
+        # is case-insensitive: (tag, rule_id, text_key, case_sensitive,
+        # match_all, keywords, keyword_ids, pattern). text_key packs the field
+        # mask and case mode into one int identifying the text the rule
+        # searches; pattern is filled in below once the scanners are known.
+        self._compiled = [
+            self._compile_rule(rule) for rule in self.rules if rule.get("keywords")
+        ]
+
+        # One scanner per case mode: case-folded text is only scanned for the
+        # folded keywords, original text only for case-sensitive ones
+        self._databases: Dict[bool, Any] = {}
+        self._automata: Dict[bool, Any] = {}
+        self._scanned: Dict[bool, bool] = {}
+        for case_sensitive, keywords in self._mode_keywords.items():
+            literals = [(kw, kid) for kw, kid in keywords.items() if kw]
+            database = (
+                self._build_database(literals) if hyperscan is not None else None
+            )
+            automaton = (
+                self._build_automaton(literals)
+                if database is None and ahocorasick is not None
+                else None
+            )
+            if database is not None:
+                self._databases[case_sensitive] = database
+            if automaton is not None:
+                self._automata[case_sensitive] = automaton
+            # Nothing to compile: the scan result is just the empty keywords
+            self._scanned[case_sensitive] = (
+                database is not None or automaton is not None or not literals
+            )
+        # Without a scanner, long any-mode rules search the text once with
+        # a compiled alternation instead of once per keyword
+        self._compiled = [
+            rule[:-1] + (self._build_pattern(rule[5]),)
+            if not self._scanned[rule[3]]
+            and not rule[4]
+            and len(rule[5]) > PATTERN_MIN_KEYWORDS
+            else rule
+            for rule in self._compiled
+        ]
+        # An empty keyword matches any non-empty text but cannot be compiled
+        self._always_ids = frozenset(
+            kid for kw, kid in self._keyword_ids.items() if not kw
+        )
+
+    def _compile_rule(self, rule: Dict[str, Any]) -> Tuple[Any, ...]:
+        """Resolve a rule document into the tuple used by ``match_many``."""
+        case_sensitive = bool(rule.get("case_sensitive", False))
+        field_mask = (
+            (FIELD_TITLE if rule.get("match_title", True) else 0)
+            | (FIELD_DESCRIPTION if rule.get("match_description", True) else 0)
+            | (FIELD_CONTENT if rule.get("match_content", False) else 0)
+        )
+        keywords = tuple(
+            kw if case_sensitive else kw.casefold() for kw in rule["keywords"]
+        )
+        keyword_ids = frozenset(
+            self._keyword_ids.setdefault(kw, len(self._keyword_ids)) for kw in keywords
+        )
+        self._mode_fields[case_sensitive] |= field_mask
+        mode_keywords = self._mode_keywords[case_sensitive]
+        for kw in keywords:
+            mode_keywords[kw] = self._keyword_ids[kw]
+        return (
+            rule["tag_name"],
+            str(rule.get("_id", "")),
+            field_mask << 1 | case_sensitive,
+            case_sensitive,
+            rule.get("match_mode", "any") == "all",
+            keywords,
+            keyword_ids,
+            None,
+        )
+
+    @staticmethod
+    def _build_pattern(keywords: Sequence[str]) -> Pattern[str]:
+        """
+        Compile keywords into one literal alternation.
+
+        Keywords are already case-folded for case-insensitive rules, so no
+        regex flags are needed.
+
+        Args:
+            keywords: Rule keywords
+
+        Returns:
+            Compiled pattern matching any of the keywords
+        """
+        return re.compile("|".join(re.escape(kw) for kw in keywords))
+
+    @staticmethod
+    def _build_database(literals: List[Tuple[str, int]]) -> Optional[Any]:
+        """
+        Compile keywords into one Hyperscan block database.
+
+        Keywords are matched as literal UTF-8 byte strings; case folding is
+        already applied to both keywords and text for case-insensitive rules.
+
+        Args:
+            literals: (keyword, keyword ID) pairs of non-empty keywords
+
+        Returns:
+            Compiled database, or None if there is nothing to compile
+        """
+        if not literals:
+            return None
+        try:
+            database = hyperscan.Database(mode=hyperscan.HS_MODE_BLOCK)
+            database.compile(
+                expressions=[
+                    b"".join(b"\\x%02x" % byte for byte in kw.encode("utf-8"))
+                    for kw, _ in literals
+                ],
+                ids=[kid for _, kid in literals],
+                elements=len(literals),
+                flags=[hyperscan.HS_FLAG_SINGLEMATCH] * len(literals),
+            )
+            return database
+        except Exception as e:
+            logger.warning(f"Hyperscan compile failed, using substring matching: {e}")
+            return None
+
+    @staticmethod
+    def _build_automaton(literals: List[Tuple[str, int]]) -> Optional[Any]:
+        """
+        Build an Aho-Corasick automaton over keywords.
+
+        Used when Hyperscan is unavailable; finds all keywords in time
+        linear in the text length, independent of the number of rules.
+
+        Args:
+            literals: (keyword, keyword ID) pairs of non-empty keywords
+
+        Returns:
+            Automaton, or None if there is nothing to add
+        """
+        if not literals:
+            return None
+        automaton = ahocorasick.Automaton()
+        for kw, kid in literals:
+            automaton.add_word(kw, kid)
+        automaton.make_automaton()
+        return automaton
+
+    def _scan(self, text: str, case_sensitive: bool) -> Set[int]:
+        """Return the IDs of the case mode's keywords occurring in ``text``."""
+        found = set(self._always_ids)
+        automaton = self._automata.get(case_sensitive)
+        if automaton is not None:
+            found.update(kid for _, kid in automaton.iter(text))
+            return found
+        database = self._databases.get(case_sensitive)
+        if database is None:
+            return found
+
+        def on_match(keyword_id, start, end, flags, context):
+            found.add(keyword_id)
+
+        database.scan(text.encode("utf-8"), match_event_handler=on_match)
+        return found
+
     def match(
         self,
         title: str,
@@ -44,117 +239,146 @@ class RuleMatcher:
         Returns:
             Tuple of (matched_tags, matched_rule_ids)
         """
-        matched_tags: Set[str] = set()
-        matched_rule_ids: List[str] = []
-
-        for rule in self.rules:
-            if self._match_rule(rule, title, description, content):
-                matched_tags.add(rule["tag_name"])
-                matched_rule_ids.append(str(rule.get("_id", "")))
-
-        return list(matched_tags), matched_rule_ids
+        return self.match_many([(title, description, content)])[0]
 
-    def _match_rule(
+    def match_many(
         self,
-        rule: Dict[str, Any],
-        title: str,
-        description: str,
-        content: str,
-    ) -> bool:
+        items: Sequence[Tuple[Optional[str], Optional[str], Optional[str]]],
+    ) -> List[Tuple[List[str], List[str]]]:
         """
-        Check if a single rule matches the news item.
+        Match several news items, iterating rules in the outer loop.
+
+        Each rule's settings are read once per batch rather than once per
+        item, and the searchable text for a given field selection and case
+        mode is built at most once per item.
 
         Args:
-            rule: Tag rule document
-            title: News item title
-            description: News item description
-            content: Full news content
+            items: (title, description, content) tuples
 
         Returns:
-            True if rule matches
+            One (matched_tags, matched_rule_ids) tuple per item
         """
-        keywords = rule.get("keywords", [])
-        if not keywords:
-            return False
-
-        match_mode = rule.get("match_mode", "any")
-        case_sensitive = rule.get("case_sensitive", False)
-
-        # Build text to search based on rule settings
-        texts_to_search: List[str] = []
-
-        if rule.get("match_title", True) and title:
-            texts_to_search.append(title)
-
-        if rule.get("match_description", True) and description:
-            texts_to_search.append(description)
-
-        if rule.get("match_content", False) and content:
-            # Truncate long content for performance
-            texts_to_search.append(content[:5000] if len(content) > 5000 else content)
-
-        if not texts_to_search:
-            return False
-
-        # Combine texts for matching
-        combined_text = " ".join(texts_to_search)
-
-        if not case_sensitive:
-            combined_text = combined_text.lower()
-
-        # Match keywords
-        if match_mode == "all":
-            # All keywords must match
-            return self._match_all(keywords, combined_text, case_sensitive)
-        else:
-            # Any keyword can match
-            return self._match_any(keywords, combined_text, case_sensitive)
-
-    def _match_any(
+        matched_tags: List[Set[str]] = [set() for _ in items]
+        matched_rule_ids: List[List[str]] = [[] for _ in items]
+        # Per item and text key: the text, or with a keyword scanner the set
+        # of keyword IDs found in it
+        texts: List[Dict[int, Any]] = [{} for _ in items]
+        # Per item and case mode: the fields, truncated once per item,
+        # case-folded at most once, and shared by every text key
+        parts: List[Dict[bool, Tuple[str, str, str]]] = [{} for _ in items]
+
+        for (
+            tag,
+            rule_id,
+            key,
+            case_sensitive,
+            match_all,
+            keywords,
+            keyword_ids,
+            pattern,
+        ) in self._compiled:
+            scanned = self._scanned[case_sensitive]
+            for i, item in enumerate(items):
+                text = texts[i].get(key)
+                if text is None:
+                    fields = parts[i].get(case_sensitive)
+                    if fields is None:
+                        fields = self._item_fields(parts[i], item, case_sensitive)
+                    text = self._build_text(key >> 1, fields)
+                    if text and scanned:
+                        text = self._scan(text, case_sensitive)
+                    texts[i][key] = text
+                if not text:
+                    continue
+                if scanned:
+                    # Set operations test every keyword ID in one C call
+                    if match_all:
+                        hit = keyword_ids <= text
+                    else:
+                        hit = not keyword_ids.isdisjoint(text)
+                elif match_all:
+                    hit = all(kw in text for kw in keywords)
+                elif pattern is not None:
+                    hit = pattern.search(text) is not None
+                else:
+                    hit = any(kw in text for kw in keywords)
+                if hit:
+                    matched_tags[i].add(tag)
+                    matched_rule_ids[i].append(rule_id)
+
+        return [
+            (list(tags), rule_ids)
+            for tags, rule_ids in zip(matched_tags, matched_rule_ids)
+        ]
+
+    def _item_fields(
         self,
-        keywords: List[str],
-        text: str,
+        cache: Dict[bool, Tuple[str, str, str]],
+        item: Tuple[Optional[str], Optional[str], Optional[str]],
         case_sensitive: bool,
-    ) -> bool:
+    ) -> Tuple[str, str, str]:
         """
-        Check if any keyword matches.
+        Normalize an item's fields for one case mode, reusing earlier work.
+
+        The original-case fields are built first and the case-folded ones
+        derived from them, so each field is truncated once per item. Fields
+        no rule of the case mode searches are left empty.
 
         Args:
-            keywords: List of keywords
-            text: Text to search in
-            case_sensitive: Whether to match case
+            cache: The item's fields per case mode, filled in as built
+            item: (title, description, content) of the news item
+            case_sensitive: Whether to keep the original case
 
         Returns:
-            True if any keyword matches
+            (title, description, content), with content truncated and all
+            three case-folded unless ``case_sensitive``
         """
-        for keyword in keywords:
-            kw = keyword if case_sensitive else keyword.lower()
-            if kw in text:
-                return True
-        return False
-
-    def _match_all(
-        self,
-        keywords: List[str],
-        text: str,
-        case_sensitive: bool,
-    ) -> bool:
+        fields = cache.get(True)
+        if fields is None:
+            title, description, content = item
+            # Truncate long content for performance, and only if searched
+            searched = self._mode_fields[False] | self._mode_fields[True]
+            fields = cache[True] = (
+                title or "",
+                description or "",
+                (content or "")[:5000] if searched & FIELD_CONTENT else "",
+            )
+        if case_sensitive:
+            return fields
+        title, description, content = fields
+        mask = self._mode_fields[False]
+        folded = cache[False] = (
+            title.casefold() if mask & FIELD_TITLE else "",
+            description.casefold() if mask & FIELD_DESCRIPTION else "",
+            content.casefold() if mask & FIELD_CONTENT else "",
+        )
+        return folded
+
+    @staticmethod
+    def _build_text(field_mask: int, fields: Tuple[str, str, str]) -> str:
         """
-        Check if all keywords match.
+        Build the text a rule searches, based on its field settings.
 
         Args:
-            keywords: List of keywords
-            text: Text to search in
-            case_sensitive: Whether to match case
+            field_mask: FIELD_* bits of the fields to search
+            fields: Item fields from ``_item_fields``
 
         Returns:
-            True if all keywords match
+            Combined text ("" if no selected field has text)
         """
-        for keyword in keywords:
-            kw = keyword if case_sensitive else keyword.lower()
-            if kw not in text:
-                return False
-        return True
+        title, description, content = fields
+        texts_to_search: List[str] = []
+
+        if field_mask & FIELD_TITLE and title:
+            texts_to_search.append(title)
+
+        if field_mask & FIELD_DESCRIPTION and description:
+            texts_to_search.append(description)
+
+        if field_mask & FIELD_CONTENT and content:
+            texts_to_search.append(content)
+
+        return " ".join(texts_to_search)
 
 
 def match_news_to_rules(
@@ -4,14 +4,20 @@ Tag Service
 CRUD operations for tag rules and tag management.
 """
 
-from datetime import datetime
-from typing import Any, Dict, List, Optional
+import asyncio
+import time
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
 
 from bson import ObjectId
 from loguru import logger
-from motor.motor_asyncio import AsyncIOMotorDatabase
+from motor.motor_asyncio import AsyncIOMotorCollection, AsyncIOMotorDatabase
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
 
 from app.schemas.tag import TagRuleCreate, TagRuleUpdate, TagRuleInDB
+from app.services.tagging.rule_matcher import RuleMatcher
 
 
 class TagService:
@@ -21,6 +27,41 @@ class TagService:
     Provides CRUD operations and tag-related queries.
     """
 
+    # Compiled matchers keyed by user ID as (rules_version, expires_at,
+    # matcher). Shared by all instances since a service is built per request;
+    # rule changes bump the version, the TTL covers other processes.
+    _matcher_cache: Dict[str, Tuple[int, float, Optional[RuleMatcher]]] = {}
+    _rules_version: Dict[str, int] = defaultdict(int)
+    _matcher_ttl = 300  # 5 minutes
+
+    # Match-count increments not yet written, per rule ObjectId. A background
+    # task writes them in one bulk_write after a short delay, or right away
+    # once enough have accumulated.
+    _pending_counts: "Counter[ObjectId]" = Counter()
+    _counts_collection: Optional[AsyncIOMotorCollection] = None
+    _flush_task: Optional[asyncio.Task] = None
+    MATCH_COUNT_FLUSH_DELAY = 0.5  # seconds
+    MATCH_COUNT_FLUSH_THRESHOLD = 1000
+
+    # Tag counts older than this are rebuilt from the news collection, which
+    # also corrects any drift from increments racing a rebuild
+    TAG_COUNTS_MAX_AGE = 3600  # seconds
+    # A rebuild holding the marker longer than this is presumed dead
+    TAG_COUNTS_BUILD_TIMEOUT = 300  # seconds
+
+    # Rule fields read by RuleMatcher (_id is always returned)
+    MATCHER_PROJECTION = {
+        "tag_name": 1,
+        "keywords": 1,
+        "match_mode": 1,
+        "case_sensitive": 1,
+        "match_title": 1,
+        "match_description": 1,
+        "match_content": 1,
+        "priority": 1,
+        "is_active": 1,
+    }
+
     def __init__(self, db: AsyncIOMotorDatabase):
         """
         Initialize tag service.
@@ -46,12 +87,79 @@ class TagService:
         Returns:
             Created tag rule document
         """
+        doc = self._rule_document(user_id, data, datetime.utcnow())
+
+        result = await self.collection.insert_one(doc)
+        doc["_id"] = result.inserted_id
+        self.invalidate_matcher(user_id)
+
+        logger.info(f"Created tag rule '{data.tag_name}' for user {user_id}")
+
+        return doc
+
+    async def create_rules_bulk(
+        self,
+        user_id: str,
+        datas: List[TagRuleCreate],
+    ) -> List[Dict[str, Any]]:
+        """
+        Create several tag rules in one round trip.
+
+        Rules whose tag name already exists for the user are skipped.
+
+        Args:
+            user_id: Owner user ID
+            datas: Tag rule creation data
+
+        Returns:
+            Created tag rule documents
+
+        Raises:
+            BulkWriteError: A rule failed for a reason other than a
+                duplicate tag name
+        """
+        if not datas:
+            return []
+
         now = datetime.utcnow()
+        docs = [self._rule_document(user_id, data, now) for data in datas]
 
-        doc = {
+        failed: Set[int] = set()
+        try:
+            await self.collection.insert_many(docs, ordered=False)
+        except BulkWriteError as e:
+            errors = e.details.get("writeErrors", [])
+            # Only duplicate tag names are expected; anything else is real
+            if any(err.get("code") != 11000 for err in errors) or e.details.get(
+                "writeConcernErrors"
+            ):
+                # Rules inserted before the failure still change matching
+                self.invalidate_matcher(user_id)
+                raise
+            failed = {err["index"] for err in errors}
+            logger.info(
+                f"Skipped {len(failed)} of {len(docs)} tag rules for user "
+                f"{user_id}: tag already exists"
+            )
+        created = [doc for i, doc in enumerate(docs) if i not in failed]
+        if created:
+            self.invalidate_matcher(user_id)
+
+        logger.info(f"Created {len(created)} tag rules for user {user_id}")
+
+        return created
+
+    @staticmethod
+    def _rule_document(
+        user_id: str,
+        data: TagRuleCreate,
+        now: datetime,
+    ) -> Dict[str, Any]:
+        """Build the MongoDB document for a new tag rule."""
+        return {
             "user_id": user_id,
             "tag_name": data.tag_name,
-            "keywords": data.keywords,
+            "keywords": TagService._unique_keywords(data.keywords),
             "match_mode": data.match_mode.value,
             "case_sensitive": data.case_sensitive,
             "match_title": data.match_title,
@@ -64,12 +172,22 @@ class TagService:
             "updated_at": now,
         }
 
-        result = await self.collection.insert_one(doc)
-        doc["_id"] = result.inserted_id
+    @staticmethod
+    def _unique_keywords(keywords: List[str]) -> List[str]:
+        """
+        Drop exact repeats of a keyword, keeping the first occurrence.
 
-        logger.info(f"Created tag rule '{data.tag_name}' for user {user_id}")
+        Case variants are kept: ``case_sensitive`` can be changed later
+        without resending keywords, and RuleMatcher folds them when it
+        compiles a case-insensitive rule.
 
-        return doc
+        Args:
+            keywords: Keywords as submitted
+
+        Returns:
+            Keywords in their original order without exact repeats
+        """
+        return list(dict.fromkeys(keywords))
 
     async def get_rule(
         self,
@@ -126,6 +244,31 @@ class TagService:
 
         return await cursor.to_list(length=limit)
 
+    async def list_rules_for_matching(
+        self,
+        user_id: str,
+        limit: int = 100,
+    ) -> List[Dict[str, Any]]:
+        """
+        List a user's active rules with only the fields the matcher reads.
+
+        Args:
+            user_id: Owner user ID
+            limit: Maximum rules to return
+
+        Returns:
+            Active tag rule documents in priority order
+        """
+        cursor = (
+            self.collection.find(
+                {"user_id": user_id, "is_active": True},
+                projection=self.MATCHER_PROJECTION,
+            )
+            .sort([("priority", -1), ("created_at", -1)])
+            .limit(limit)
+        )
+        return await cursor.to_list(length=limit)
+
     async def update_rule(
         self,
         rule_id: str,
@@ -149,12 +292,12 @@ class TagService:
             return None
 
         # Build update fields (only include non-None values)
-        update_fields = {"updated_at": datetime.utcnow()}
+        update_fields: Dict[str, Any] = {}
 
         if data.tag_name is not None:
             update_fields["tag_name"] = data.tag_name
         if data.keywords is not None:
-            update_fields["keywords"] = data.keywords
+            update_fields["keywords"] = self._unique_keywords(data.keywords)
         if data.match_mode is not None:
             update_fields["match_mode"] = data.match_mode.value
         if data.case_sensitive is not None:
@@ -170,6 +313,11 @@ class TagService:
         if data.is_active is not None:
             update_fields["is_active"] = data.is_active
 
+        if not update_fields:
+            # Nothing to change: leave updated_at and the cached matcher alone
+            return await self.collection.find_one({"_id": oid, "user_id": user_id})
+
+        update_fields["updated_at"] = datetime.utcnow()
         result = await self.collection.update_one(
             {"_id": oid, "user_id": user_id},
             {"$set": update_fields},
@@ -177,6 +325,7 @@ class TagService:
 
         if result.matched_count == 0:
             return None
+        self.invalidate_matcher(user_id)
 
         return await self.collection.find_one({"_id": oid})
 
@@ -203,11 +352,49 @@ class TagService:
         result = await self.collection.delete_one({"_id": oid, "user_id": user_id})
 
         if result.deleted_count > 0:
+            self.invalidate_matcher(user_id)
             logger.info(f"Deleted tag rule {rule_id} for user {user_id}")
             return True
 
         return False
 
+    async def get_matcher(self, user_id: str) -> Optional[RuleMatcher]:
+        """
+        Get the compiled RuleMatcher for a user's active rules.
+
+        The matcher (and its keyword scanners) is built once and reused until
+        the user's rules change or the TTL expires.
+
+        Args:
+            user_id: Owner user ID
+
+        Returns:
+            RuleMatcher, or None if the user has no active rules
+        """
+        version = self._rules_version[user_id]
+        now = time.monotonic()
+        cached = self._matcher_cache.get(user_id)
+        if cached and cached[0] == version and cached[1] > now:
+            return cached[2]
+
+        rules = await self.list_rules_for_matching(user_id)
+        matcher = RuleMatcher(rules) if rules else None
+        # Stored under the version read before the fetch, so a concurrent
+        # rule change still forces a rebuild
+        self._matcher_cache[user_id] = (version, now + self._matcher_ttl, matcher)
+        return matcher
+
+    @classmethod
+    def invalidate_matcher(cls, user_id: str) -> None:
+        """
+        Drop a user's cached matcher after their rules change.
+
+        Args:
+            user_id: Owner user ID
+        """
+        cls._rules_version[user_id] += 1
+        cls._matcher_cache.pop(user_id, None)
+
     async def increment_match_count(
         self,
         rule_ids: List[str],
@@ -215,8 +402,11 @@ class TagService:
         """
         Increment match count for multiple rules.
 
+        Increments are buffered and written in batches; call
+        ``flush_match_counts`` when they must be visible immediately.
+
         Args:
-            rule_ids: List of tag rule IDs
+            rule_ids: List of tag rule IDs (repeated IDs count repeatedly)
         """
         if not rule_ids:
             return
@@ -228,11 +418,39 @@ class TagService:
             except Exception:
                 continue
 
-        if oids:
-            await self.collection.update_many(
-                {"_id": {"$in": oids}},
-                {"$inc": {"match_count": 1}},
+        if not oids:
+            return
+        cls = type(self)
+        cls._pending_counts.update(oids)
+        cls._counts_collection = self.collection
+        if sum(cls._pending_counts.values()) >= cls.MATCH_COUNT_FLUSH_THRESHOLD:
+            await cls.flush_match_counts()
+        elif cls._flush_task is None or cls._flush_task.done():
+            cls._flush_task = asyncio.create_task(cls._flush_match_counts_later())
+
+    @classmethod
+    async def _flush_match_counts_later(cls) -> None:
+        """Write buffered match counts after the flush delay."""
+        await asyncio.sleep(cls.MATCH_COUNT_FLUSH_DELAY)
+        await cls.flush_match_counts()
+
+    @classmethod
+    async def flush_match_counts(cls) -> None:
+        """Write all buffered match-count increments in one bulk_write."""
+        pending = cls._pending_counts
+        if not pending or cls._counts_collection is None:
+            return
+        cls._pending_counts = Counter()
+        try:
+            await cls._counts_collection.bulk_write(
+                [
+                    UpdateOne({"_id": oid}, {"$inc": {"match_count": count}})
+                    for oid, count in pending.items()
+                ],
+                ordered=False,
             )
+        except Exception as e:
+            logger.warning(f"Failed to update tag rule match counts: {e}")
 
     async def get_user_tags(
         self,
@@ -241,22 +459,189 @@ class TagService:
         """
         Get all unique tags used by a user with their counts.
 
+        Counts are read from the ``user_tag_counts`` collection, built from
+        the news collection on first use and kept current by
+        ``bump_tag_counts``.
+
         Args:
             user_id: Owner user ID
 
         Returns:
             List of {tag_name, count} dicts
         """
+        counts = self.db.user_tag_counts
+        # The doc with tag_name None points at the current generation of
+        # counts and records when it was built
+        marker = await counts.find_one({"user_id": user_id, "tag_name": None})
+        built_at = marker.get("built_at") if marker else None
+        if built_at is None or (
+            datetime.utcnow() - built_at
+        ).total_seconds() > self.TAG_COUNTS_MAX_AGE:
+            marker = await self.rebuild_tag_counts(user_id) or marker
+
+        current = marker.get("current") if marker else None
+        if current is None:
+            # First build still running elsewhere: count directly
+            rows = await self._count_news_tags(user_id)
+            rows.sort(key=lambda row: row["count"], reverse=True)
+            return [
+                {"tag_name": row["_id"], "count": row["count"]} for row in rows[:500]
+            ]
+
+        cursor = (
+            counts.find(
+                {"user_id": user_id, "gen": current, "count": {"$gt": 0}},
+                projection={"_id": 0, "tag_name": 1, "count": 1},
+            )
+            .sort("count", -1)
+            .limit(500)
+        )
+        return await cursor.to_list(length=500)
+
+    async def _count_news_tags(self, user_id: str) -> List[Dict[str, Any]]:
+        """Aggregate ``{_id: tag, count}`` rows from a user's news items."""
         pipeline = [
             {"$match": {"user_id": user_id}},
             {"$unwind": "$tags"},
             {"$group": {"_id": "$tags", "count": {"$sum": 1}}},
-            {"$sort": {"count": -1}},
-            {"$project": {"tag_name": "$_id", "count": 1, "_id": 0}},
+            {"$match": {"_id": {"$ne": None}}},
         ]
+        return await self.db.news.aggregate(pipeline).to_list(length=None)
 
-        cursor = self.db.news.aggregate(pipeline)
-        return await cursor.to_list(length=500)
+    async def rebuild_tag_counts(self, user_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Recompute a user's tag counts from their news items.
+
+        The counts are written under a new generation while readers keep
+        using the current one. The marker then switches generations in a
+        single update and the previous generation is deleted, so readers
+        only ever see a complete set. ``bump_tag_counts`` applies to the
+        generation being built as well as the current one.
+
+        Args:
+            user_id: Owner user ID
+
+        Returns:
+            The updated marker, or None if another rebuild holds it
+        """
+        counts = self.db.user_tag_counts
+        gen = ObjectId()
+        now = datetime.utcnow()
+        stale = now - timedelta(seconds=self.TAG_COUNTS_BUILD_TIMEOUT)
+        try:
+            marker = await counts.find_one_and_update(
+                {
+                    "user_id": user_id,
+                    "tag_name": None,
+                    "gen": None,
+                    "$or": [
+                        {"building": None},
+                        {"building_at": {"$lt": stale}},
+                    ],
+                },
+                {"$set": {"building": gen, "building_at": now}},
+                upsert=True,
+                return_document=ReturnDocument.BEFORE,
+            )
+        except DuplicateKeyError:
+            # The marker exists but a concurrent rebuild holds it
+            return None
+        previous = marker.get("current") if marker else None
+
+        rows = await self._count_news_tags(user_id)
+        # $inc upserts commute with bumps landing in the new generation
+        ops = [
+            UpdateOne(
+                {"user_id": user_id, "gen": gen, "tag_name": row["_id"]},
+                {"$inc": {"count": row["count"]}},
+                upsert=True,
+            )
+            for row in rows
+        ]
+        if ops:
+            await counts.bulk_write(ops, ordered=False)
+
+        marker = await counts.find_one_and_update(
+            {"user_id": user_id, "tag_name": None, "gen": None, "building": gen},
+            {
+                "$set": {"current": gen, "built_at": datetime.utcnow()},
+                "$unset": {"building": "", "building_at": ""},
+            },
+            return_document=ReturnDocument.AFTER,
+        )
+        if marker is None:
+            # Timed out and taken over by another rebuild
+            await counts.delete_many({"user_id": user_id, "gen": gen})
+            return None
+
+        # Previous generation, plus rows written before generations existed
+        await counts.delete_many(
+            {
+                "user_id": user_id,
+                "tag_name": {"$ne": None},
+                "gen": {"$in": [previous, None]},
+            }
+        )
+        return marker
+
+    async def bump_tag_counts(
+        self,
+        user_id: str,
+        added: Iterable[str] = (),
+        removed: Iterable[str] = (),
+    ) -> None:
+        """
+        Apply tag additions and removals to a user's tag counts.
+
+        Args:
+            user_id: Owner user ID
+            added: Tags added to news items, once per item
+            removed: Tags removed from news items, once per item
+        """
+        delta: "Counter[str]" = Counter(added)
+        delta.subtract(removed)
+        if not any(delta.values()):
+            return
+        counts = self.db.user_tag_counts
+        try:
+            marker = await counts.find_one(
+                {"user_id": user_id, "tag_name": None},
+                projection={"current": 1, "building": 1},
+            )
+            if marker is None:
+                # Nothing built yet; the first read counts from the news items
+                return
+            ops = [
+                UpdateOne(
+                    {"user_id": user_id, "gen": gen, "tag_name": tag},
+                    {"$inc": {"count": n}},
+                    upsert=True,
+                )
+                for gen in (marker.get("current"), marker.get("building"))
+                if gen is not None
+                for tag, n in delta.items()
+                if n
+            ]
+            if ops:
+                await counts.bulk_write(ops, ordered=False)
+        except Exception as e:
+            logger.warning(f"Failed to update tag counts for user {user_id}: {e}")
+            await self.invalidate_tag_counts(user_id)
+
+    async def invalidate_tag_counts(self, user_id: str) -> None:
+        """
+        Force a rebuild of a user's tag counts on the next read.
+
+        For changes whose tags are not known, such as bulk deletes. The
+        current counts stay readable until the rebuild replaces them.
+
+        Args:
+            user_id: Owner user ID
+        """
+        await self.db.user_tag_counts.update_one(
+            {"user_id": user_id, "tag_name": None, "gen": None},
+            {"$unset": {"built_at": ""}},
+        )
 
     async def get_rules_count(self, user_id: str) -> int:
         """
@@ -5,19 +5,17 @@ Populates the database with a demo user, sources, and tag rules for defense pres
 
 Usage:
     cd backend
-    python scripts/init_demo_data.py
+    python -m scripts.init_demo_data
 """
 
 import asyncio
 import sys
 from datetime import datetime
-from pathlib import Path
-
-# Add project root to path
-sys.path.append(str(Path(__file__).parent.parent))
 
 from loguru import logger
+from motor.motor_asyncio import AsyncIOMotorDatabase
 from passlib.context import CryptContext
+from pymongo import UpdateOne, WriteConcern
 
 from app.db.mongo import mongodb
 from app.services.tagging import TagService
@@ -26,6 +24,197 @@ from app.schemas.tag import TagRuleCreate, MatchMode
 # Password hashing
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# Seeding is idempotent and re-runnable, so acknowledging writes from the
+# primary's memory is enough; don't wait for the journal. Scoped to this
+# script, the application keeps the client's default write concern.
+SEED_WRITE_CONCERN = WriteConcern(w=1, j=False)
+
+# Demo content seeded for the demo user
+DEMO_SOURCES = [
+    {
+        "name": "36Kr",
+        "url": "https://36kr.com/feed",
+        "source_type": "rss",
+        "description": "Tech news and startup coverage",
+    },
+    {
+        "name": "V2EX",
+        "url": "https://www.v2ex.com/index.xml",
+        "source_type": "rss",
+        "description": "Creative worker community",
+    },
+    {
+        "name": "InfoQ",
+        "url": "https://feed.infoq.com/",
+        "source_type": "rss",
+        "description": "Software development news",
+    },
+    {
+        "name": "Hacker News",
+        "url": "https://news.ycombinator.com/rss",
+        "source_type": "rss",
+        "description": "Tech news and discussions",
+    },
+    {
+        "name": "OSChina",
+        "url": "https://www.oschina.net/news/rss",
+        "source_type": "rss",
+        "description": "Open source community news",
+    },
+]
+
+DEMO_RULES = [
+    {
+        "tag_name": "AI",
+        "keywords": [
+            "AI",
+            "Artificial Intelligence",
+            "LLM",
+            "GPT",
+            "Deep Learning",
+            "Machine Learning",
+            "人工智能",
+            "大模型",
+        ],
+        "priority": 10,
+    },
+    {
+        "tag_name": "Frontend",
+        "keywords": [
+            "Vue",
+            "React",
+            "Angular",
+            "CSS",
+            "JavaScript",
+            "TypeScript",
+            "Web",
+            "前端",
+        ],
+        "priority": 5,
+    },
+    {
+        "tag_name": "Backend",
+        "keywords": [
+            "Python",
+            "Java",
+            "Go",
+            "Rust",
+            "FastAPI",
+            "Django",
+            "Spring",
+            "后端",
+            "Database",
+            "SQL",
+        ],
+        "priority": 5,
+    },
+    {
+        "tag_name": "Startup",
+        "keywords": [
+            "Startup",
+            "Funding",
+            "VC",
+            "Investment",
+            "创业",
+            "融资",
+            "IPO",
+        ],
+        "priority": 3,
+    },
+    {
+        "tag_name": "Cloud",
+        "keywords": [
+            "Cloud",
+            "AWS",
+            "Azure",
+            "Kubernetes",
+            "Docker",
+            "DevOps",
+            "云原生",
+            "云计算",
+        ],
+        "priority": 4,
+    },
+]
+
+
+async def seed_sources(
+    db: AsyncIOMotorDatabase, user_id: str, now: datetime
+) -> None:
+    """Add the demo sources the user does not have yet."""
+    # Upsert on the unique (user_id, url) index: sources already stored
+    # are left untouched, the rest inserted, all in one round trip
+    ops = [
+        UpdateOne(
+            {"user_id": user_id, "url": src["url"]},
+            {
+                "$setOnInsert": {
+                    "user_id": user_id,
+                    "name": src["name"],
+                    "url": src["url"],
+                    "source_type": src["source_type"],
+                    "description": src["description"],
+                    "logo_url": None,
+                    "homepage": None,
+                    "tags": [],
+                    "parser_config": None,
+                    "refresh_interval_minutes": 60,
+                    "status": "pending",
+                    "last_fetched_at": None,
+                    "last_error": None,
+                    "fetch_count": 0,
+                    "item_count": 0,
+                    "created_at": now,
+                    "updated_at": now,
+                }
+            },
+            upsert=True,
+        )
+        for src in DEMO_SOURCES
+    ]
+    result = await db.sources.bulk_write(ops, ordered=False)
+    for index in sorted(result.upserted_ids):
+        logger.info(f"Added source: {DEMO_SOURCES[index]['name']}")
+
+
+async def seed_tag_rules(tag_service: TagService, user_id: str) -> None:
+    """Add the demo tag rules the user does not have yet."""
+    # Rules whose tag name already exists hit the unique
+    # (user_id, tag_name) index and are skipped
+    created = await tag_service.create_rules_bulk(
+        user_id,
+        [
+            TagRuleCreate(
+                tag_name=rule["tag_name"],
+                keywords=rule["keywords"],
+                priority=rule["priority"],
+                match_mode=MatchMode.ANY,
+                match_title=True,
+                match_description=True,
+                match_content=False,
+            )
+            for rule in DEMO_RULES
+        ],
+    )
+    for doc in created:
+        logger.info(f"Added tag rule: {doc['tag_name']}")
+
+
+async def demo_data_present(db: AsyncIOMotorDatabase, user_id: str) -> bool:
+    """Whether every demo source and tag rule already exists for the user."""
+    sources, rules = await asyncio.gather(
+        db.sources.count_documents(
+            {"user_id": user_id, "url": {"$in": [s["url"] for s in DEMO_SOURCES]}}
+        ),
+        db.tag_rules.count_documents(
+            {
+                "user_id": user_id,
+                "tag_name": {"$in": [r["tag_name"] for r in DEMO_RULES]},
+            }
+        ),
+    )
+    return sources == len(DEMO_SOURCES) and rules == len(DEMO_RULES)
+
 
 async def init_demo_data():
     """Main initialization function."""
@@ -33,9 +222,15 @@ async def init_demo_data():
 
     # Connect to DB
     await mongodb.connect()
+    # The unique (user_id, url) and (user_id, tag_name) indexes make the
+    # inserts below idempotent
+    await mongodb.create_indexes()
     db = mongodb.db
 
     try:
+        # One timestamp for everything created in this run
+        now = datetime.utcnow()
+
         # 1. Create Demo User
         demo_user = await db.users.find_one({"username": "demo"})
         if not demo_user:
@@ -47,171 +242,25 @@ async def init_demo_data():
                     "email": "demo@newshub.com",
                     "hashed_password": hashed_password,
                     "is_active": True,
-                    "created_at": datetime.utcnow(),
+                    "created_at": now,
                 }
             )
             user_id = str(result.inserted_id)
         else:
             logger.info("Demo user already exists")
             user_id = str(demo_user["_id"])
+            # Re-runs usually find everything in place: two counts instead
+            # of two bulk writes that would all be no-ops
+            if await demo_data_present(db, user_id):
+                logger.info("Demo data already seeded")
+                return
 
-        # 2. Add Sources (Direct DB insertion)
-        existing_sources_cursor = db.sources.find({"user_id": user_id})
-        existing_sources = await existing_sources_cursor.to_list(length=100)
-        existing_urls = {s["url"] for s in existing_sources}
-
-        demo_sources = [
-            {
-                "name": "36Kr",
-                "url": "https://36kr.com/feed",
-                "source_type": "rss",
-                "description": "Tech news and startup coverage",
-            },
-            {
-                "name": "V2EX",
-                "url": "https://www.v2ex.com/index.xml",
-                "source_type": "rss",
-                "description": "Creative worker community",
-            },
-            {
-                "name": "InfoQ",
-                "url": "https://feed.infoq.com/",
-                "source_type": "rss",
-                "description": "Software development news",
-            },
-            {
-                "name": "Hacker News",
-                "url": "https://news.ycombinator.com/rss",
-                "source_type": "rss",
-                "description": "Tech news and discussions",
-            },
-            {
-                "name": "OSChina",
-                "url": "https://www.oschina.net/news/rss",
-                "source_type": "rss",
-                "description": "Open source community news",
-            },
-        ]
-
-        now = datetime.utcnow()
-        for src in demo_sources:
-            if src["url"] not in existing_urls:
-                logger.info(f"Adding source: {src['name']}")
-                source_doc = {
-                    "user_id": user_id,
-                    "name": src["name"],
-                    "url": src["url"],
-                    "source_type": src["source_type"],
-                    "description": src["description"],
-                    "logo_url": None,
-                    "homepage": None,
-                    "tags": [],
-                    "parser_config": None,
-                    "refresh_interval_minutes": 60,
-                    "status": "pending",
-                    "last_fetched_at": None,
-                    "last_error": None,
-                    "fetch_count": 0,
-                    "item_count": 0,
-                    "created_at": now,
-                    "updated_at": now,
-                }
-                await db.sources.insert_one(source_doc)
-
-        # 3. Add Tag Rules
-        tag_service = TagService(db)
-        existing_rules = await tag_service.list_rules(user_id)
-        existing_tags = {r["tag_name"] for r in existing_rules}
-
-        demo_rules = [
-            {
-                "tag_name": "AI",
-                "keywords": [
-                    "AI",
-                    "Artificial Intelligence",
-                    "LLM",
-                    "GPT",
-                    "Deep Learning",
-                    "Machine Learning",
-                    "人工智能",
-                    "大模型",
-                ],
-                "priority": 10,
-            },
-            {
-                "tag_name": "Frontend",
-                "keywords": [
-                    "Vue",
-                    "React",
-                    "Angular",
-                    "CSS",
-                    "JavaScript",
-                    "TypeScript",
-                    "Web",
-                    "前端",
-                ],
-                "priority": 5,
-            },
-            {
-                "tag_name": "Backend",
-                "keywords": [
-                    "Python",
-                    "Java",
-                    "Go",
-                    "Rust",
-                    "FastAPI",
-                    "Django",
-                    "Spring",
-                    "后端",
-                    "Database",
-                    "SQL",
-                ],
-                "priority": 5,
-            },
-            {
-                "tag_name": "Startup",
-                "keywords": [
-                    "Startup",
-                    "Funding",
-                    "VC",
-                    "Investment",
-                    "创业",
-                    "融资",
-                    "IPO",
-                ],
-                "priority": 3,
-            },
-            {
-                "tag_name": "Cloud",
-                "keywords": [
-                    "Cloud",
-                    "AWS",
-                    "Azure",
-                    "Kubernetes",
-                    "Docker",
-                    "DevOps",
-                    "云原生",
-                    "云计算",
-                ],
-                "priority": 4,
-            },
-        ]
-
-        for rule in demo_rules:
-            if rule["tag_name"] not in existing_tags:
-                logger.info(f"Adding tag rule: {rule['tag_name']}")
-                await tag_service.create_rule(
-                    user_id,
-                    TagRuleCreate(
-                        tag_name=rule["tag_name"],
-                        keywords=rule["keywords"],
-                        priority=rule["priority"],
-                        match_mode=MatchMode.ANY,
-                        match_title=True,
-                        match_description=True,
-                        match_content=False,
-                    ),
-                )
+        # 2. Add Sources and 3. Add Tag Rules: independent, so run together
+        seed_db = db.with_options(write_concern=SEED_WRITE_CONCERN)
+        await asyncio.gather(
+            seed_sources(seed_db, user_id, now),
+            seed_tag_rules(TagService(seed_db), user_id),
+        )
 
         logger.success("Demo data initialization complete!")
         logger.info(f"Login with: demo / demo123")
@@ -220,7 +269,21 @@ async def init_demo_data():
         await mongodb.disconnect()
 
 
-if __name__ == "__main__":
+def main() -> None:
+    """Command-line entry point."""
     if sys.platform == "win32":
         asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+    else:
+        # uvloop ships with uvicorn[standard]; the Motor round-trips here
+        # benefit from it just like the API server does
+        try:
+            import uvloop
+        except ImportError:
+            pass
+        else:
+            asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
     asyncio.run(init_demo_data())
+
+
+if __name__ == "__main__":
+    main()